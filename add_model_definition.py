@@ -1,16 +1,45 @@
-import os
-from dotenv import load_dotenv
+import ssl
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from env_cache import env, load_once
+from helpers.output_buffer import p, buffered
 
+class _SSLContextAdapter(HTTPAdapter):
+    """HTTPAdapter that hands one prebuilt SSLContext to every pooled connection"""
+    
+    def __init__(self, ssl_context, **kwargs):
+        self._ssl_context = ssl_context
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['ssl_context'] = self._ssl_context
+        return super().init_poolmanager(*args, **kwargs)
+
+# Certificate verification is disabled for this helper; build the context once
+_SSL_CONTEXT = ssl.create_default_context()
+_SSL_CONTEXT.check_hostname = False
+_SSL_CONTEXT.verify_mode = ssl.CERT_NONE
+
+# Shared session so the POST/PUT round trips reuse one pooled TLS connection
+_SESSION = requests.Session()
+_SESSION.verify = False
+_SESSION.headers.update({"Connection": "keep-alive"})
+_SESSION.mount('https://', _SSLContextAdapter(_SSL_CONTEXT, pool_connections=10, pool_maxsize=20,
+                                              max_retries=Retry(total=2, backoff_factor=0.1)))
+_SESSION.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=20,
+                                      max_retries=Retry(total=2, backoff_factor=0.1)))
+
+@buffered
 def add_model_definition():
     # Load environment variables
-    load_dotenv('config.env')
+    load_once('config.env')
     
     # Langfuse API details
-    host = os.getenv('LANGFUSE_HOST').replace('https://', 'http://')  # Force HTTP
-    public_key = os.getenv('LANGFUSE_PUBLIC_KEY')
-    secret_key = os.getenv('LANGFUSE_SECRET_KEY')
+    host = env('LANGFUSE_HOST').replace('https://', 'http://')  # Force HTTP
+    public_key = env('LANGFUSE_PUBLIC_KEY')
+    secret_key = env('LANGFUSE_SECRET_KEY')
     
     # Model definition for Claude 3 Sonnet
     model_definition = {
@@ -36,41 +65,35 @@ def add_model_definition():
             "Content-Type": "application/json"
         }
         
-        print("\n=== Adding Model Definition ===")
-        print(f"Host: {host}")
-        print(f"Model: {model_definition['modelName']}")
-        print(f"Input Price: ${model_definition['inputPrice'] * 1000}/1K tokens")
-        print(f"Output Price: ${model_definition['outputPrice'] * 1000}/1K tokens")
+        p("\n=== Adding Model Definition ===")
+        p(f"Host: {host}")
+        p(f"Model: {model_definition['modelName']}")
+        p(f"Input Price: ${model_definition['inputPrice'] * 1000}/1K tokens")
+        p(f"Output Price: ${model_definition['outputPrice'] * 1000}/1K tokens")
+        
+        # PUT creates or updates in one round trip; fall back to POST if PUT is not allowed
+        p("\nAttempting to upsert model...")
+        response = _SESSION.put(url, json=model_definition, auth=auth, headers=headers)
         
-        # First try POST to create
-        print("\nAttempting to create model...")
-        response = requests.post(url, json=model_definition, auth=auth, headers=headers, verify=False)
+        if response.status_code == 405:
+            p("Upsert not supported. Attempting to create...")
+            response = _SESSION.post(url, json=model_definition, auth=auth, headers=headers)
         
         if response.status_code in [200, 201]:
-            print("✅ Model definition created successfully!")
-        elif response.status_code == 409:
-            # Model exists, try PUT to update
-            print("Model already exists. Attempting to update...")
-            response = requests.put(url, json=model_definition, auth=auth, headers=headers, verify=False)
-            if response.status_code in [200, 201]:
-                print("✅ Model definition updated successfully!")
-            else:
-                print(f"❌ Error updating model:")
-                print(f"Status code: {response.status_code}")
-                print(f"Response: {response.text}")
+            p("✅ Model definition saved successfully!")
         else:
-            print(f"❌ Error creating model:")
-            print(f"Status code: {response.status_code}")
-            print(f"Response: {response.text}")
+            p(f"❌ Error saving model:")
+            p(f"Status code: {response.status_code}")
+            p(f"Response: {response.text}")
             
         # Print response details for debugging
-        print("\nResponse Details:")
-        print(f"Status Code: {response.status_code}")
-        print("Headers:", response.headers)
-        print("Response Body:", response.text)
+        p("\nResponse Details:")
+        p(f"Status Code: {response.status_code}")
+        p("Headers:", response.headers)
+        p("Response Body:", response.text)
         
     except Exception as e:
-        print(f"\n❌ Error: {str(e)}")
+        p(f"\n❌ Error: {str(e)}")
 
 if __name__ == "__main__":
     add_model_definition()
\ No newline at end of file
@@ -1,73 +1,76 @@
 import boto3
 import json
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from helpers.output_buffer import p, buffered
 
+@buffered
 def check_bedrock_permissions():
-    # Initialize boto3 clients
-    sts = boto3.client('sts')
-    iam = boto3.client('iam')
-    bedrock = boto3.client('bedrock')
+    # Initialize boto3 clients from one session so credential resolution happens once
+    session = boto3.Session()
+    sts = session.client('sts')
+    iam = session.client('iam')
+    bedrock = session.client(
+        'bedrock',
+        config=Config(retries={'max_attempts': 3, 'mode': 'adaptive'}, max_pool_connections=20)
+    )
     
     try:
         # Get current identity
         identity = sts.get_caller_identity()
-        print("\n=== Current AWS Identity ===")
-        print(f"Account: {identity['Account']}")
-        print(f"User ID: {identity['UserId']}")
-        print(f"ARN: {identity['Arn']}")
+        p("\n=== Current AWS Identity ===")
+        p(f"Account: {identity['Account']}")
+        p(f"User ID: {identity['UserId']}")
+        p(f"ARN: {identity['Arn']}")
         
         # Get user/role name from ARN
         arn_parts = identity['Arn'].split('/')
         if 'assumed-role' in identity['Arn']:
-            role_name = arn_parts[-1]
-            print(f"\nChecking permissions for role: {role_name}")
-            
-            # Get role policies
-            attached_policies = iam.list_attached_role_policies(RoleName=role_name)
-            print("\n=== Attached Policies ===")
-            for policy in attached_policies['AttachedPolicies']:
-                print(f"- {policy['PolicyName']}")
-                
-            # Get inline policies
-            inline_policies = iam.list_role_policies(RoleName=role_name)
-            print("\n=== Inline Policies ===")
-            for policy_name in inline_policies['PolicyNames']:
-                print(f"- {policy_name}")
-                
+            principal_name = arn_parts[-2]
+            principal_filter, detail_key, name_key, inline_key = 'Role', 'RoleDetailList', 'RoleName', 'RolePolicyList'
+            p(f"\nChecking permissions for role: {principal_name}")
         else:
-            user_name = arn_parts[-1]
-            print(f"\nChecking permissions for user: {user_name}")
-            
-            # Get user policies
-            attached_policies = iam.list_attached_user_policies(UserName=user_name)
-            print("\n=== Attached Policies ===")
-            for policy in attached_policies['AttachedPolicies']:
-                print(f"- {policy['PolicyName']}")
-                
-            # Get inline policies
-            inline_policies = iam.list_user_policies(UserName=user_name)
-            print("\n=== Inline Policies ===")
-            for policy_name in inline_policies['PolicyNames']:
-                print(f"- {policy_name}")
-        
+            principal_name = arn_parts[-1]
+            principal_filter, detail_key, name_key, inline_key = 'User', 'UserDetailList', 'UserName', 'UserPolicyList'
+            p(f"\nChecking permissions for user: {principal_name}")
+
+        # Single paginated call returns attached and inline policies for every principal
+        paginator = iam.get_paginator('get_account_authorization_details')
+        details = paginator.paginate(
+            Filter=[principal_filter],
+            PaginationConfig={'PageSize': 1000}
+        ).build_full_result()
+        principal = next(
+            (item for item in details.get(detail_key, []) if item[name_key] == principal_name),
+            {}
+        )
+
+        p("\n=== Attached Policies ===")
+        for policy in principal.get('AttachedManagedPolicies', []):
+            p(f"- {policy['PolicyName']}")
+
+        p("\n=== Inline Policies ===")
+        for policy in principal.get(inline_key, []):
+            p(f"- {policy['PolicyName']}")
+
         # Test Bedrock permissions
-        print("\n=== Testing Bedrock Permissions ===")
+        p("\n=== Testing Bedrock Permissions ===")
         try:
             # Try to list foundation models
             response = bedrock.list_foundation_models()
-            print("✅ Successfully listed foundation models")
+            p("✅ Successfully listed foundation models")
         except ClientError as e:
-            print(f"❌ Error listing foundation models: {str(e)}")
+            p(f"❌ Error listing foundation models: {str(e)}")
             
         try:
             # Try to list agents
             response = bedrock.list_agents()
-            print("✅ Successfully listed agents")
+            p("✅ Successfully listed agents")
         except ClientError as e:
-            print(f"❌ Error listing agents: {str(e)}")
+            p(f"❌ Error listing agents: {str(e)}")
             
     except Exception as e:
-        print(f"Error: {str(e)}")
+        p(f"Error: {str(e)}")
 
 if __name__ == "__main__":
     check_bedrock_permissions() 
\ No newline at end of file
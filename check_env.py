@@ -1,11 +1,17 @@
-import os
-from dotenv import load_dotenv
-from langfuse import Langfuse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from env_cache import env, host_netloc, load_once
+
+# Shared session so repeated probes reuse one pooled TLS connection
+_SESSION = requests.Session()
+_SESSION.headers.update({"Connection": "keep-alive"})
+_SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20,
+                                       max_retries=Retry(total=2, backoff_factor=0.1)))
 
 def check_environment():
     # Load environment variables
-    load_dotenv('config.env')
+    load_once('config.env')
     
     # Check required environment variables
     required_vars = [
@@ -16,7 +22,7 @@ def check_environment():
     
     print("\n=== Environment Variables Check ===")
     for var in required_vars:
-        value = os.getenv(var)
+        value = env(var)
         if value:
             print(f"✅ {var}: Set")
         else:
@@ -25,28 +31,29 @@ def check_environment():
     # Test network connectivity
     print("\n=== Network Connectivity Check ===")
     try:
-        host = os.getenv("LANGFUSE_HOST")
+        host = host_netloc()
         if not host:
             print("❌ LANGFUSE_HOST not set")
             return
         
-        # Remove protocol if present
-        host = host.replace("https://", "").replace("http://", "")
-        
         print(f"Testing connection to {host}...")
-        response = requests.get(f"https://{host}/api/public/health", timeout=5)
+        response = _SESSION.get(f"https://{host}/api/public/health", timeout=5)
         print(f"✅ Connection successful (Status: {response.status_code})")
         
         # Initialize Langfuse client
         print("\n=== Langfuse Client Test ===")
+        from langfuse import Langfuse
         langfuse = Langfuse(
-            public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
-            secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
-            host=os.getenv("LANGFUSE_HOST"),
-            debug=True
+            public_key=env("LANGFUSE_PUBLIC_KEY"),
+            secret_key=env("LANGFUSE_SECRET_KEY"),
+            host=env("LANGFUSE_HOST"),
+            debug=True,
+            # Let the SDK's background sender batch the test events
+            flush_at=10,
+            flush_interval=1.0
         )
         
-        # Create test trace
+        # Queue test trace (events are sent in one batch on flush)
         print("Creating test trace...")
         trace = langfuse.trace(
             name="connection_test",
@@ -76,8 +83,8 @@ def check_environment():
             metadata={"status": "success"}
         )
         
-        # Force flush
-        print("Flushing client...")
+        # Single flush sends every queued event in one batch
+        print("Flushing batched events...")
         langfuse.flush()
         
         print("\n✅ All tests completed successfully!")
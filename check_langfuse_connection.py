@@ -1,51 +1,62 @@
-import os
-import requests
+import asyncio
 import socket
-from urllib3.exceptions import NewConnectionError
+import aiohttp
+import httpx
 from dotenv import load_dotenv
+from env_cache import host_netloc
+from helpers.output_buffer import p, buffered
 
+async def _head_health(host):
+    # One HEAD over HTTPS proves TCP, TLS and the HTTP path in a single round trip
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=10, ssl=False)) as session:
+        async with session.head(f"https://{host}/api/public/health",
+                                timeout=aiohttp.ClientTimeout(total=5)) as response:
+            return response.status
+
+async def _probe(client, host, endpoint):
+    return await client.get(f"https://{host}{endpoint}", timeout=5)
+
+async def _gather(host, endpoints):
+    # One client so all probes overlap on the same connection pool
+    limits = httpx.Limits(max_connections=8, max_keepalive_connections=8)
+    async with httpx.AsyncClient(limits=limits, verify=False) as client:
+        return await asyncio.gather(
+            *[_probe(client, host, endpoint) for endpoint in endpoints],
+            return_exceptions=True
+        )
+
+@buffered
 def check_load_balancer():
     load_dotenv()
-    host = os.getenv("LANGFUSE_HOST")
+    host = host_netloc()
     
     if not host:
-        print("❌ LANGFUSE_HOST not set")
+        p("❌ LANGFUSE_HOST not set")
         return
     
-    # Remove protocol if present
-    host = host.replace("https://", "").replace("http://", "")
-    
-    print(f"\n=== Testing Load Balancer Connection ===")
-    print(f"Host: {host}")
-    
-    # Test 1: Basic TCP connection
-    try:
-        print("\n1. Testing basic TCP connection...")
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(5)
-        sock.connect((host, 443))
-        sock.close()
-        print("✅ TCP connection successful")
-    except Exception as e:
-        print(f"❌ TCP connection failed: {str(e)}")
-    
-    # Test 2: HTTP connection
-    try:
-        print("\n2. Testing HTTP connection...")
-        response = requests.get(f"http://{host}/api/public/health", timeout=5, verify=False)
-        print(f"✅ HTTP connection successful (Status: {response.status_code})")
-    except Exception as e:
-        print(f"❌ HTTP connection failed: {str(e)}")
+    p(f"\n=== Testing Load Balancer Connection ===")
+    p(f"Host: {host}")
     
-    # Test 3: HTTPS connection
+    # Test 1: HTTPS health check (falls back to a raw TCP probe on connection errors)
     try:
-        print("\n3. Testing HTTPS connection...")
-        response = requests.get(f"https://{host}/api/public/health", timeout=5, verify=False)
-        print(f"✅ HTTPS connection successful (Status: {response.status_code})")
+        p("\n1. Testing HTTPS connection...")
+        status = asyncio.run(_head_health(host))
+        p(f"✅ HTTPS connection successful (Status: {status})")
+    except aiohttp.ClientConnectorError as e:
+        p(f"❌ HTTPS connection failed: {str(e)}")
+        try:
+            p("   Testing basic TCP connection...")
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(5)
+            sock.connect((host, 443))
+            sock.close()
+            p("✅ TCP connection successful")
+        except Exception as e:
+            p(f"❌ TCP connection failed: {str(e)}")
     except Exception as e:
-        print(f"❌ HTTPS connection failed: {str(e)}")
+        p(f"❌ HTTPS connection failed: {str(e)}")
     
-    # Test 4: Different endpoints
+    # Test 2: Different endpoints
     endpoints = [
         "/health",
         "/api/health",
@@ -53,22 +64,22 @@ def check_load_balancer():
         "/"
     ]
     
-    print("\n4. Testing different endpoints...")
-    for endpoint in endpoints:
-        try:
-            response = requests.get(f"https://{host}{endpoint}", timeout=5, verify=False)
-            print(f"✅ {endpoint}: Success (Status: {response.status_code})")
-        except Exception as e:
-            print(f"❌ {endpoint}: Failed ({str(e)})")
+    p("\n2. Testing different endpoints...")
+    responses = asyncio.run(_gather(host, endpoints))
+    for endpoint, response in zip(endpoints, responses):
+        if isinstance(response, Exception):
+            p(f"❌ {endpoint}: Failed ({str(response)})")
+        else:
+            p(f"✅ {endpoint}: Success (Status: {response.status_code})")
     
-    print("\n=== Troubleshooting Steps ===")
-    print("1. Check if the load balancer is in the same VPC as your notebook")
-    print("2. Verify the security group rules:")
-    print("   - Inbound: Allow TCP 443 from your notebook's IP")
-    print("   - Outbound: Allow all traffic")
-    print("3. Check if the load balancer's target group is healthy")
-    print("4. Verify the load balancer's listeners are configured for HTTPS")
-    print("5. Check if there are any network ACLs blocking the traffic")
+    p("\n=== Troubleshooting Steps ===")
+    p("1. Check if the load balancer is in the same VPC as your notebook")
+    p("2. Verify the security group rules:")
+    p("   - Inbound: Allow TCP 443 from your notebook's IP")
+    p("   - Outbound: Allow all traffic")
+    p("3. Check if the load balancer's target group is healthy")
+    p("4. Verify the load balancer's listeners are configured for HTTPS")
+    p("5. Check if there are any network ACLs blocking the traffic")
 
 if __name__ == "__main__":
     check_load_balancer() 
\ No newline at end of file
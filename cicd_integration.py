@@ -1,17 +1,25 @@
 import os
 import json
-import yaml
 import time
 import logging
+import collections
+import numpy as np
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import subprocess
 import sys
 from pathlib import Path
-import requests
 from concurrent_evaluator import ConcurrentEvaluationOrchestrator, run_concurrent_evaluation
 from hooks_system import HooksManager, create_default_hooks, HookType, HookContext
+from env_cache import env, load_once
+
+try:
+    import orjson
+    _dumps = lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:  # fall back to stdlib json
+    orjson = None
+    _dumps = lambda obj: json.dumps(obj, indent=2)
 
 logger = logging.getLogger(__name__)
 
@@ -50,12 +58,27 @@ class CICDPipeline:
     - Automated reporting
     """
     
-    def __init__(self, config: Dict[str, Any], quality_gate: QualityGate = None):
+    BASELINE_WINDOW = 3  # number of previous runs averaged for regression detection
+    HISTORY_FILE = 'evaluation_history.jsonl'
+    LEGACY_HISTORY_FILE = 'evaluation_history.json'  # pre-JSONL format, imported once
+    
+    def __init__(self, config: Dict[str, Any], quality_gate: QualityGate = None,
+                 hook_max_workers: int = 8, output_dir: str = 'cicd_results'):
         self.config = config
+        # Where reports and the history file are written, and history is reloaded from
+        self.output_dir = output_dir
         self.quality_gate = quality_gate or QualityGate()
         self.hooks_manager = create_default_hooks()
-        self.evaluation_history = []
+        self.hooks_manager.max_workers = hook_max_workers
+        self.evaluation_history = collections.deque(maxlen=int(env('EVAL_HISTORY_MAX', '100')))
+        self._history_loaded = False
         self.regression_threshold = 0.1  # 10% degradation threshold
+        self._quality_gate_dict = asdict(self.quality_gate)
+        
+        # Ring buffer of the last BASELINE_WINDOW runs' scores (NaN = metric missing)
+        self._metrics = list(self.quality_gate.required_metrics)
+        self._score_matrix = np.full((self.BASELINE_WINDOW, len(self._metrics)), np.nan)
+        self._history_len = 0
         
     def run_evaluation_pipeline(self, data_file: str, max_workers: int = 5) -> Dict[str, Any]:
         """Run the complete evaluation pipeline"""
@@ -80,7 +103,8 @@ class CICDPipeline:
         
         # Run concurrent evaluation
         start_time = time.time()
-        evaluation_results = run_concurrent_evaluation(data_file, max_workers)
+        evaluation_results = run_concurrent_evaluation(data_file, max_workers,
+                                                       output_dir=self.output_dir)
         end_time = time.time()
         
         evaluation_results['execution_time'] = end_time - start_time
@@ -108,23 +132,31 @@ class CICDPipeline:
             post_results
         )
         
-        # Store in history
+        # Store in history; the full report is in pipeline_report_<timestamp>.json,
+        # so the history only keeps what regression detection reads back
         self.evaluation_history.append({
-            'timestamp': datetime.now().isoformat(),
-            'results': evaluation_results,
-            'quality_gate': quality_gate_result,
-            'regression': regression_result,
-            'pipeline_report': pipeline_report
+            'timestamp': pipeline_report['timestamp'],
+            'summary': evaluation_results['summary'],
+            'quality_gate_passed': quality_gate_result['passed'],
+            'regression_detected': regression_result['regression_detected']
         })
+        self._update_baseline(evaluation_results['summary'])
         
         return pipeline_report
     
+    def _update_baseline(self, summary: Dict[str, Any]) -> None:
+        """Write the latest run's scores into the regression baseline ring buffer"""
+        avg_scores = summary.get('average_scores', {})
+        row = self._history_len % self.BASELINE_WINDOW
+        self._score_matrix[row] = [avg_scores.get(metric, np.nan) for metric in self._metrics]
+        self._history_len += 1
+    
     def _check_pre_pipeline_tests(self, pre_results: List[Dict[str, Any]]) -> bool:
         """Check if pre-pipeline tests passed"""
-        for result in pre_results:
-            if result['status'] != 'success':
-                logger.error(f"Pre-pipeline test failed: {result['hook_name']}")
-                return False
+        failed = [result for result in pre_results if result['status'] != 'success']
+        if failed:
+            logger.error('Pre-pipeline tests failed: %s', ','.join(result['hook_name'] for result in failed))
+            return False
         return True
     
     def _check_quality_gates(self, evaluation_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -148,7 +180,7 @@ class CICDPipeline:
         return {
             'passed': all_passed,
             'checks': checks,
-            'thresholds': asdict(self.quality_gate),
+            'thresholds': self._quality_gate_dict,
             'actual_values': {
                 'success_rate': summary.get('success_rate', 0.0),
                 'execution_time': evaluation_results.get('execution_time', 0.0),
@@ -157,48 +189,93 @@ class CICDPipeline:
             }
         }
     
+    @staticmethod
+    def _read_last_lines(path: str, count: int, block_size: int = 8192) -> List[bytes]:
+        """Last count non-empty lines of a file, read backwards from its end"""
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            data = b''
+            # One extra newline so the first kept line is known to be complete
+            while pos > 0 and data.count(b'\n') <= count:
+                step = min(block_size, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        return [line for line in data.split(b'\n') if line.strip()][-count:]
+    
+    def _import_legacy_history(self, output_dir: str, history_file: str) -> None:
+        """Convert a pre-JSONL evaluation_history.json into the JSONL history file"""
+        legacy_file = os.path.join(output_dir, self.LEGACY_HISTORY_FILE)
+        if not os.path.exists(legacy_file):
+            return
+        with open(legacy_file, 'r') as f:
+            legacy = json.load(f)
+        dumps = orjson.dumps if orjson is not None else lambda obj: json.dumps(obj).encode('utf-8')
+        with open(history_file, 'wb') as f:
+            for entry in legacy:
+                f.write(dumps({
+                    'timestamp': entry.get('timestamp'),
+                    'summary': entry.get('results', {}).get('summary', {}),
+                    'quality_gate_passed': entry.get('quality_gate', {}).get('passed'),
+                    'regression_detected': entry.get('regression', {}).get('regression_detected')
+                }))
+                f.write(b'\n')
+        logger.info(f"Imported {len(legacy)} runs from {legacy_file} into {history_file}")
+    
+    def _load_recent_history(self, output_dir: Optional[str] = None) -> None:
+        """Seed in-memory history and baseline from the tail of the on-disk history"""
+        self._history_loaded = True
+        output_dir = output_dir or self.output_dir
+        history_file = os.path.join(output_dir, self.HISTORY_FILE)
+        if not os.path.exists(history_file):
+            self._import_legacy_history(output_dir, history_file)
+            if not os.path.exists(history_file):
+                return
+        
+        # Only the baseline window is needed for regression detection
+        loads = orjson.loads if orjson is not None else json.loads
+        for line in self._read_last_lines(history_file, self.BASELINE_WINDOW):
+            entry = loads(line)
+            self.evaluation_history.append(entry)
+            self._update_baseline(entry['summary'])
+    
     def _check_performance_regression(self, current_results: Dict[str, Any]) -> Dict[str, Any]:
         """Check for performance regression compared to previous runs"""
+        if not self._history_loaded:
+            self._load_recent_history()
+        
         if len(self.evaluation_history) < 2:
             return {
                 'regression_detected': False,
                 'reason': 'Insufficient history for regression detection'
             }
         
-        # Get previous results (last 3 runs for stability)
-        recent_history = self.evaluation_history[-3:]
-        if not recent_history:
-            return {
-                'regression_detected': False,
-                'reason': 'No previous results available'
-            }
-        
-        # Calculate baseline metrics
-        baseline_scores = {}
-        for metric in self.quality_gate.required_metrics:
-            scores = []
-            for historical_run in recent_history:
-                avg_scores = historical_run['results']['summary'].get('average_scores', {})
-                if metric in avg_scores:
-                    scores.append(avg_scores[metric])
-            
-            if scores:
-                baseline_scores[metric] = sum(scores) / len(scores)
+        # Baseline metrics over the last 3 runs for stability
+        window = self._score_matrix[:min(self._history_len, self.BASELINE_WINDOW)]
+        present = ~np.isnan(window)
+        counts = present.sum(axis=0)
+        sums = np.where(present, window, 0.0).sum(axis=0)
+        baseline_vec = np.divide(sums, counts, out=np.full(len(self._metrics), np.nan), where=counts > 0)
+        baseline_scores = {
+            metric: float(baseline_vec[i])
+            for i, metric in enumerate(self._metrics)
+            if counts[i]
+        }
         
         # Compare with current results
         current_scores = current_results['summary'].get('average_scores', {})
-        regressions = {}
+        current_vec = np.array([current_scores.get(metric, 0.0) for metric in self._metrics])
+        degradation = baseline_vec - current_vec
+        mask = (counts > 0) & (degradation > self.regression_threshold)
         
-        for metric, baseline_score in baseline_scores.items():
-            current_score = current_scores.get(metric, 0.0)
-            degradation = baseline_score - current_score
-            
-            if degradation > self.regression_threshold:
-                regressions[metric] = {
-                    'baseline': baseline_score,
-                    'current': current_score,
-                    'degradation': degradation
-                }
+        regressions = {}
+        for i in mask.nonzero()[0]:
+            regressions[self._metrics[i]] = {
+                'baseline': float(baseline_vec[i]),
+                'current': float(current_vec[i]),
+                'degradation': float(degradation[i])
+            }
         
         regression_detected = len(regressions) > 0
         
@@ -239,9 +316,14 @@ class CICDPipeline:
     def generate_ci_report(self, pipeline_report: Dict[str, Any], output_format: str = 'json') -> str:
         """Generate CI/CD compatible report"""
         if output_format == 'json':
-            return json.dumps(pipeline_report, indent=2)
+            return _dumps(pipeline_report)
         elif output_format == 'yaml':
-            return yaml.dump(pipeline_report, default_flow_style=False)
+            import yaml
+            try:
+                from yaml import CSafeDumper as _YamlDumper
+            except ImportError:  # libyaml not available
+                from yaml import SafeDumper as _YamlDumper
+            return yaml.dump(pipeline_report, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False)
         elif output_format == 'markdown':
             return self._generate_markdown_report(pipeline_report)
         else:
@@ -255,7 +337,7 @@ class CICDPipeline:
             'warning': '⚠️'
         }
         
-        report = f"""
+        parts: List[str] = [f"""
 # Agent Evaluation Pipeline Report
 
 **Status:** {status_emoji.get(pipeline_report['status'], '❓')} {pipeline_report['status'].upper()}
@@ -268,50 +350,60 @@ class CICDPipeline:
 - **Execution Time:** {pipeline_report['execution_time']:.2f} seconds
 
 ## Quality Gate Results
-"""
+"""]
         
         qg = pipeline_report['quality_gate']
         if qg['passed']:
-            report += "✅ **Quality Gate: PASSED**\n\n"
+            parts.append("✅ **Quality Gate: PASSED**\n\n")
         else:
-            report += "❌ **Quality Gate: FAILED**\n\n"
+            parts.append("❌ **Quality Gate: FAILED**\n\n")
         
         for check_name, passed in qg['checks'].items():
-            status = "✅" if passed else "❌"
-            report += f"- {status} {check_name}\n"
+            parts.append(f"- {'✅' if passed else '❌'} {check_name}\n")
         
-        report += "\n## Performance Regression\n"
+        parts.append("\n## Performance Regression\n")
         
         pr = pipeline_report['performance_regression']
         if pr['regression_detected']:
-            report += "⚠️ **Performance Regression Detected**\n\n"
+            parts.append("⚠️ **Performance Regression Detected**\n\n")
             for metric, details in pr['regressions'].items():
-                report += f"- **{metric}**: {details['degradation']:.3f} degradation\n"
+                parts.append(f"- **{metric}**: {details['degradation']:.3f} degradation\n")
         else:
-            report += "✅ **No Performance Regression Detected**\n"
+            parts.append("✅ **No Performance Regression Detected**\n")
         
-        return report
+        return ''.join(parts)
     
-    def save_results(self, pipeline_report: Dict[str, Any], output_dir: str = 'cicd_results'):
-        """Save pipeline results to files"""
+    def save_results(self, pipeline_report: Dict[str, Any], output_dir: Optional[str] = None):
+        """Save pipeline results to files, by default in the pipeline's output_dir"""
+        output_dir = output_dir or self.output_dir
         os.makedirs(output_dir, exist_ok=True)
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         # Save JSON report
         json_file = os.path.join(output_dir, f'pipeline_report_{timestamp}.json')
-        with open(json_file, 'w') as f:
-            json.dump(pipeline_report, f, indent=2)
+        if orjson is not None:
+            with open(json_file, 'wb') as f:
+                f.write(orjson.dumps(pipeline_report, option=orjson.OPT_INDENT_2))
+        else:
+            with open(json_file, 'w') as f:
+                json.dump(pipeline_report, f, indent=2)
         
         # Save markdown report
         md_file = os.path.join(output_dir, f'pipeline_report_{timestamp}.md')
         with open(md_file, 'w') as f:
             f.write(self.generate_ci_report(pipeline_report, 'markdown'))
         
-        # Save evaluation history
-        history_file = os.path.join(output_dir, 'evaluation_history.json')
-        with open(history_file, 'w') as f:
-            json.dump(self.evaluation_history, f, indent=2)
+        # Append only the latest run to the JSON-lines evaluation history
+        history_file = os.path.join(output_dir, self.HISTORY_FILE)
+        if self.evaluation_history:
+            latest = self.evaluation_history[-1]
+            with open(history_file, 'ab') as f:
+                if orjson is not None:
+                    f.write(orjson.dumps(latest))
+                else:
+                    f.write(json.dumps(latest).encode('utf-8'))
+                f.write(b'\n')
         
         logger.info(f"Results saved to {output_dir}")
         return {
@@ -326,12 +418,24 @@ class GitHubActionsIntegration:
     @staticmethod
     def set_output(name: str, value: str):
         """Set GitHub Actions output"""
-        if os.getenv('GITHUB_OUTPUT'):
-            with open(os.getenv('GITHUB_OUTPUT'), 'a') as f:
+        output_path = env('GITHUB_OUTPUT')
+        if output_path:
+            with open(output_path, 'a') as f:
                 f.write(f'{name}={value}\n')
         else:
             print(f"::set-output name={name}::{value}")
     
+    @staticmethod
+    def set_outputs(outputs: Dict[str, Any]):
+        """Set several outputs at once, written to GITHUB_OUTPUT in one open/write"""
+        output_path = env('GITHUB_OUTPUT')
+        if output_path:
+            with open(output_path, 'a') as f:
+                f.write(''.join(f'{name}={value}\n' for name, value in outputs.items()))
+        else:
+            for name, value in outputs.items():
+                print(f"::set-output name={name}::{value}")
+    
     @staticmethod
     def set_status(status: str, conclusion: str = None):
         """Set GitHub Actions status"""
@@ -347,6 +451,11 @@ class GitLabCIIntegration:
         """Set GitLab CI variable"""
         print(f"echo '{name}={value}' >> $GITLAB_ENV")
     
+    @staticmethod
+    def set_variables(variables: Dict[str, Any]):
+        """Set several GitLab CI variables with a single write"""
+        print(''.join(f"echo '{name}={value}' >> $GITLAB_ENV\n" for name, value in variables.items()), end='')
+    
     @staticmethod
     def create_artifact(path: str, name: str):
         """Create GitLab CI artifact"""
@@ -373,11 +482,11 @@ def create_cicd_workflow(config: Dict[str, Any],
     
     # CI/CD platform integration
     if ci_platform == 'github':
-        GitHubActionsIntegration.set_output('status', pipeline_report['status'])
-        GitHubActionsIntegration.set_output('success_rate', 
-                                          str(pipeline_report['evaluation_summary']['success_rate']))
-        GitHubActionsIntegration.set_output('execution_time', 
-                                          str(pipeline_report['execution_time']))
+        GitHubActionsIntegration.set_outputs({
+            'status': pipeline_report['status'],
+            'success_rate': pipeline_report['evaluation_summary']['success_rate'],
+            'execution_time': pipeline_report['execution_time']
+        })
         
         if pipeline_report['status'] == 'failed':
             GitHubActionsIntegration.set_status('failure', 'failure')
@@ -387,9 +496,10 @@ def create_cicd_workflow(config: Dict[str, Any],
             GitHubActionsIntegration.set_status('success', 'success')
     
     elif ci_platform == 'gitlab':
-        GitLabCIIntegration.set_variable('EVALUATION_STATUS', pipeline_report['status'])
-        GitLabCIIntegration.set_variable('SUCCESS_RATE', 
-                                       str(pipeline_report['evaluation_summary']['success_rate']))
+        GitLabCIIntegration.set_variables({
+            'EVALUATION_STATUS': pipeline_report['status'],
+            'SUCCESS_RATE': pipeline_report['evaluation_summary']['success_rate']
+        })
         GitLabCIIntegration.create_artifact('cicd_results/*', 'evaluation-results')
     
     return {
@@ -467,10 +577,7 @@ jobs:
 """
 
 if __name__ == "__main__":
-    import os
-    from dotenv import load_dotenv
-    
-    load_dotenv('config.env')
+    load_once('config.env')
     
     # Setup environment and config
     from single_run import setup_environment, get_config
@@ -487,8 +594,8 @@ if __name__ == "__main__":
     )
     
     # Run CI/CD pipeline
-    data_file = os.getenv('DATA_FILE_PATH', 'data_files/data_file.json')
-    ci_platform = os.getenv('CI_PLATFORM', 'github')
+    data_file = env('DATA_FILE_PATH', 'data_files/data_file.json')
+    ci_platform = env('CI_PLATFORM', 'github')
     
     result = create_cicd_workflow(config, data_file, quality_gate, ci_platform)
     
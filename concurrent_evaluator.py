@@ -1,23 +1,51 @@
 import asyncio
-import concurrent.futures
-import threading
-from typing import Dict, Any, List, Optional, Callable
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import time
 import json
 import uuid
-from queue import Queue
+import sys
+import threading
 import logging
 
-from single_run import setup_environment, get_config, create_evaluator
+from single_run import setup_environment, get_config, create_evaluator, get_evaluator_class
 from helpers.agent_info_extractor import AgentInfoExtractor
+from evaluators.cot_evaluator import FatalEvalError
+
+try:
+    import orjson
+    _loads = orjson.loads
+    
+    def _dumps_line(record: Dict[str, Any]) -> bytes:
+        return orjson.dumps(record, default=str) + b"\n"
+except ImportError:  # fall back to stdlib json
+    _loads = json.loads
+    
+    def _dumps_line(record: Dict[str, Any]) -> bytes:
+        return (json.dumps(record, default=str) + "\n").encode()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+DEFAULT_MAX_CONCURRENT_TURNS = 3
+
+_ALLOWED_METRICS = frozenset({'helpfulness', 'faithfulness', 'instruction_following', 'overall'})
+
+# Set EVAL_SINGLE_TURN_FAST_PATH=0 to send single-turn sessions through the general path
+_SINGLE_TURN_FAST_PATH = os.getenv('EVAL_SINGLE_TURN_FAST_PATH', '1') != '0'
+
+# Returned by a pool worker that found the run already aborted
+_CANCELLED = object()
+
+# Slotted dataclasses drop the per-instance __dict__; slots= needs Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class ConversationTurn:
     """Represents a single turn in a multi-turn conversation"""
     turn_id: int
@@ -26,14 +54,14 @@ class ConversationTurn:
     evaluation_type: str
     metadata: Dict[str, Any] = None
 
-@dataclass
+@dataclass(**_SLOTS)
 class ConversationSession:
     """Represents a complete conversation session"""
     session_id: str
     trajectory_id: str
     turns: List[ConversationTurn]
     context: Dict[str, Any] = None
-    max_concurrent_turns: int = 3
+    max_concurrent_turns: int = DEFAULT_MAX_CONCURRENT_TURNS
 
 class ConcurrentEvaluationOrchestrator:
     """
@@ -47,12 +75,18 @@ class ConcurrentEvaluationOrchestrator:
     - Integration with existing evaluators
     """
     
-    def __init__(self, config: Dict[str, Any], max_workers: int = 5):
+    def __init__(self, config: Dict[str, Any], max_workers: int = 5,
+                 results_path: Optional[str] = None, executor_kind: str = 'thread',
+                 output_dir: str = '.'):
+        if executor_kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor kind: {executor_kind}")
         self.config = config
         self.max_workers = max_workers
-        self.results_queue = Queue()
+        # None: each run gets its own timestamped file under output_dir
+        self.results_path = results_path
+        self.output_dir = output_dir
+        self.executor_kind = executor_kind
         self.active_sessions = {}
-        self.session_locks = {}
         
         # Initialize shared resources
         self.extractor = AgentInfoExtractor(config['clients']['bedrock_agent_client'])
@@ -61,9 +95,44 @@ class ConcurrentEvaluationOrchestrator:
             config['AGENT_ALIAS_ID']
         )
         
+        # Bind the per-run arguments once instead of re-passing them for every turn
+        self._eval_kwargs = {'config': config, 'agent_info': self.agent_info}
+        self._make_evaluator = functools.partial(create_evaluator, **self._eval_kwargs)
+        
         # Setup Langfuse
         self.langfuse_client = setup_environment()
         
+        # One worker pool for the orchestrator's lifetime; every (session, turn)
+        # is run on it, so threads are not spawned and torn down per session
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers * DEFAULT_MAX_CONCURRENT_TURNS,
+            thread_name_prefix='eval'
+        )
+        # Only built the first time a CPU_BOUND evaluator is submitted
+        self._process_pool = None
+        # Set by the first fatal (auth/config) error so remaining turns are skipped.
+        # A threading.Event only needs is_set/set and, unlike asyncio.Event on 3.9,
+        # does not bind to an event loop when created outside one
+        self._abort = threading.Event()
+    
+    def __enter__(self) -> 'ConcurrentEvaluationOrchestrator':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # On failure, drop queued turns instead of running them to completion
+        self._pool.shutdown(wait=True, cancel_futures=exc_type is not None)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True, cancel_futures=exc_type is not None)
+    
+    def _executor_for(self, eval_type: str) -> Executor:
+        """Thread pool for I/O-bound evaluators, process pool for CPU_BOUND ones
+        (or for every evaluator when executor_kind is 'process')"""
+        if self.executor_kind == 'thread' and not get_evaluator_class(eval_type).CPU_BOUND:
+            return self._pool
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._process_pool
+        
     def create_conversation_session(self, trajectory_id: str, turns_data: List[Dict]) -> ConversationSession:
         """Create a conversation session from trajectory data"""
         session_id = str(uuid.uuid4())
@@ -84,35 +153,58 @@ class ConcurrentEvaluationOrchestrator:
             trajectory_id=trajectory_id,
             turns=turns,
             context={},
-            max_concurrent_turns=3
+            max_concurrent_turns=DEFAULT_MAX_CONCURRENT_TURNS
         )
         
         self.active_sessions[session_id] = session
-        self.session_locks[session_id] = threading.Lock()
         
         return session
     
-    def evaluate_single_turn(self, session: ConversationSession, turn: ConversationTurn) -> Dict[str, Any]:
+    async def evaluate_single_turn(self, session: ConversationSession, turn: ConversationTurn) -> Dict[str, Any]:
         """Evaluate a single conversation turn"""
+        eval_kwargs = {
+            'eval_type': turn.evaluation_type,
+            'data': {
+                'question': turn.question,
+                'ground_truth': turn.expected_response,
+                'question_id': turn.turn_id,
+                'metadata': turn.metadata
+            },
+            'trace_id': uuid.uuid4().hex,
+            'session_id': session.session_id,
+            'trajectory_id': session.trajectory_id
+        }
+        
+        def _run() -> Optional[Dict[str, Any]]:
+            # Turns queue up on the pool, so check again once a worker picks this one up
+            if self._abort.is_set():
+                return _CANCELLED
+            # Create evaluator for this turn and run it
+            return self._make_evaluator(**eval_kwargs).run_evaluation()
+        
+        cancelled = {
+            'session_id': session.session_id,
+            'turn_id': turn.turn_id,
+            'status': 'cancelled',
+            'error': 'Run aborted after a fatal error',
+        }
+        
+        # Another turn already hit a fatal error, so don't spend quota on this one
+        if self._abort.is_set():
+            return {**cancelled, 'ts': time.time()}
+        
         try:
-            # Create evaluator for this turn
-            evaluator = create_evaluator(
-                eval_type=turn.evaluation_type,
-                config=self.config,
-                agent_info=self.agent_info,
-                data={
-                    'question': turn.question,
-                    'ground_truth': turn.expected_response,
-                    'question_id': turn.turn_id,
-                    'metadata': turn.metadata
-                },
-                trace_id=str(uuid.uuid1()),
-                session_id=session.session_id,
-                trajectory_id=session.trajectory_id
-            )
+            # boto3 is synchronous, so the blocking evaluation runs on a worker pool;
+            # a worker process cannot share our clients, so it builds its own
+            executor = self._executor_for(turn.evaluation_type)
+            if executor is self._pool:
+                work = _run
+            else:
+                work = functools.partial(_evaluate_in_process, self.agent_info, eval_kwargs)
+            results = await asyncio.get_running_loop().run_in_executor(executor, work)
             
-            # Run evaluation
-            results = evaluator.run_evaluation()
+            if results is _CANCELLED:
+                return {**cancelled, 'ts': time.time()}
             
             if results is None:
                 logger.warning(f"Evaluation failed for session {session.session_id}, turn {turn.turn_id}")
@@ -120,7 +212,8 @@ class ConcurrentEvaluationOrchestrator:
                     'session_id': session.session_id,
                     'turn_id': turn.turn_id,
                     'status': 'failed',
-                    'error': 'Evaluation returned None'
+                    'error': 'Evaluation returned None',
+                    'ts': time.time()
                 }
             
             return {
@@ -128,9 +221,14 @@ class ConcurrentEvaluationOrchestrator:
                 'turn_id': turn.turn_id,
                 'status': 'success',
                 'results': results,
-                'timestamp': datetime.now().isoformat()
+                'ts': time.time()
             }
             
+        except FatalEvalError as e:
+            logger.error(f"Fatal error in turn {turn.turn_id} of session {session.session_id}, aborting run: {str(e)}")
+            self._abort.set()
+            raise
+            
         except Exception as e:
             logger.error(f"Error evaluating turn {turn.turn_id} in session {session.session_id}: {str(e)}")
             return {
@@ -138,48 +236,57 @@ class ConcurrentEvaluationOrchestrator:
                 'turn_id': turn.turn_id,
                 'status': 'error',
                 'error': str(e),
-                'timestamp': datetime.now().isoformat()
+                'ts': time.time()
             }
     
-    def process_conversation_session(self, session: ConversationSession) -> List[Dict[str, Any]]:
+    async def process_conversation_session(self, session: ConversationSession) -> List[Dict[str, Any]]:
         """Process a complete conversation session with multi-turn support"""
+        # A single turn has nothing to overlap with, so await it inline
+        if _SINGLE_TURN_FAST_PATH and len(session.turns) == 1:
+            turn = session.turns[0]
+            result = await self.evaluate_single_turn(session, turn)
+            if result['status'] == 'success':
+                self._update_session_context(session, turn, result)
+            logger.info(f"Completed evaluation for session {session.session_id}, turn {turn.turn_id}")
+            return [result]
+        
         results = []
         
-        # Process turns with controlled concurrency
-        with concurrent.futures.ThreadPoolExecutor(max_workers=session.max_concurrent_turns) as executor:
-            # Submit all turns for evaluation
-            future_to_turn = {
-                executor.submit(self.evaluate_single_turn, session, turn): turn 
-                for turn in session.turns
-            }
-            
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(future_to_turn):
-                turn = future_to_turn[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                    
-                    # Update session context based on results
-                    if result['status'] == 'success':
-                        self._update_session_context(session, turn, result)
-                    
-                    logger.info(f"Completed evaluation for session {session.session_id}, turn {turn.turn_id}")
-                    
-                except Exception as e:
-                    logger.error(f"Exception in turn {turn.turn_id}: {str(e)}")
-                    results.append({
-                        'session_id': session.session_id,
-                        'turn_id': turn.turn_id,
-                        'status': 'exception',
-                        'error': str(e),
-                        'timestamp': datetime.now().isoformat()
-                    })
+        # Turns from every session share one pool, so no per-session throttle is needed
+        async def run_turn(turn: ConversationTurn):
+            try:
+                return turn, await self.evaluate_single_turn(session, turn), None
+            except FatalEvalError:
+                raise
+            except Exception as e:
+                return turn, None, e
+        
+        # Collect results as they complete
+        for next_done in asyncio.as_completed([run_turn(turn) for turn in session.turns]):
+            turn, result, error = await next_done
+            if error is None:
+                results.append(result)
+                
+                # Update session context based on results
+                if result['status'] == 'success':
+                    self._update_session_context(session, turn, result)
+                
+                logger.info(f"Completed evaluation for session {session.session_id}, turn {turn.turn_id}")
+            else:
+                logger.error(f"Exception in turn {turn.turn_id}: {str(error)}")
+                results.append({
+                    'session_id': session.session_id,
+                    'turn_id': turn.turn_id,
+                    'status': 'exception',
+                    'error': str(error),
+                    'ts': time.time()
+                })
         
         return results
     
     def _update_session_context(self, session: ConversationSession, turn: ConversationTurn, result: Dict[str, Any]):
         """Update session context based on evaluation results"""
+        # Only called from the event loop thread, so a plain dict needs no locking
         if 'results' in result and 'agent_response' in result['results']:
             # Store agent response in context for future turns
             session.context[f'turn_{turn.turn_id}_response'] = result['results']['agent_response']
@@ -187,14 +294,11 @@ class ConcurrentEvaluationOrchestrator:
             # You can add more sophisticated context management here
             # For example, extracting key information, maintaining conversation state, etc.
     
-    def run_concurrent_evaluations(self, data_file: str) -> Dict[str, Any]:
+    async def run_concurrent_evaluations(self, data_file: str) -> Dict[str, Any]:
         """Run concurrent evaluations on multiple conversation sessions"""
         # Load conversation data
-        with open(data_file, 'r') as f:
-            data_dict = json.load(f)
-        
-        all_results = {}
-        session_results = []
+        with open(data_file, 'rb') as f:
+            data_dict = _loads(f.read())
         
         # Create conversation sessions
         sessions = []
@@ -204,125 +308,198 @@ class ConcurrentEvaluationOrchestrator:
         
         logger.info(f"Created {len(sessions)} conversation sessions for evaluation")
         
-        # Process sessions concurrently
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all sessions for processing
-            future_to_session = {
-                executor.submit(self.process_conversation_session, session): session 
-                for session in sessions
-            }
-            
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(future_to_session):
-                session = future_to_session[future]
-                try:
-                    session_result = future.result()
-                    session_results.append({
+        # Process sessions concurrently; all (session, turn) pairs are fed to a
+        # single pool, so idle workers pick up turns from any session
+        async def run_session(session: ConversationSession):
+            try:
+                return session, await self.process_conversation_session(session), None
+            except FatalEvalError:
+                raise
+            except Exception as e:
+                return session, None, e
+        
+        # A fatal (auth/config) error sets _abort and then propagates out of
+        # here, cancelling the remaining turns; each run starts clear
+        self._abort.clear()
+        stats = self._new_summary_stats()
+        
+        # Fold each session into the summary and write it out as soon as it
+        # completes, so finished sessions are not held in memory
+        results_path = self.results_path or session_results_path(self.output_dir)
+        os.makedirs(os.path.dirname(results_path) or '.', exist_ok=True)
+        with open(results_path, 'wb') as out:
+            for next_done in asyncio.as_completed([run_session(session) for session in sessions]):
+                session, session_result, error = await next_done
+                if error is None:
+                    session_record = {
                         'session_id': session.session_id,
                         'trajectory_id': session.trajectory_id,
                         'results': session_result,
                         'context': session.context
-                    })
-                    
-                    all_results[session.trajectory_id] = {
-                        'session_id': session.session_id,
-                        'results': session_result,
-                        'context': session.context
                     }
-                    
                     logger.info(f"Completed session {session.session_id} ({session.trajectory_id})")
-                    
-                except Exception as e:
-                    logger.error(f"Exception in session {session.session_id}: {str(e)}")
-                    session_results.append({
+                else:
+                    logger.error(f"Exception in session {session.session_id}: {str(error)}")
+                    session_record = {
                         'session_id': session.session_id,
                         'trajectory_id': session.trajectory_id,
-                        'error': str(e),
+                        'error': str(error),
                         'status': 'failed'
-                    })
+                    }
+                
+                self._accumulate_summary(stats, session_record)
+                out.write(_dumps_line(session_record))
+                self.active_sessions.pop(session.session_id, None)
         
         # Generate summary statistics
-        summary = self._generate_evaluation_summary(session_results)
+        summary = self._generate_evaluation_summary(stats)
         
         return {
             'summary': summary,
-            'sessions': session_results,
-            'all_results': all_results,
+            'results_file': results_path,
             'total_sessions': len(sessions),
             'total_turns': sum(len(session.turns) for session in sessions),
             'timestamp': datetime.now().isoformat()
         }
     
-    def _generate_evaluation_summary(self, session_results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate summary statistics from evaluation results"""
-        total_turns = 0
-        successful_turns = 0
-        failed_turns = 0
-        error_turns = 0
-        
-        evaluation_scores = {
-            'helpfulness': [],
-            'faithfulness': [],
-            'instruction_following': [],
-            'overall': []
+    def _new_summary_stats(self) -> Dict[str, Any]:
+        """Empty running statistics for _accumulate_summary"""
+        return {
+            'total_turns': 0,
+            'successful_turns': 0,
+            'failed_turns': 0,
+            'error_turns': 0,
+            'total_sessions': 0,
+            # metric -> [count, running mean]
+            'evaluation_scores': {
+                'helpfulness': [0, 0.0],
+                'faithfulness': [0, 0.0],
+                'instruction_following': [0, 0.0],
+                'overall': [0, 0.0]
+            }
         }
+    
+    def _accumulate_summary(self, stats: Dict[str, Any], session_result: Dict[str, Any]) -> None:
+        """Fold one completed session into the running summary statistics"""
+        stats['total_sessions'] += 1
+        evaluation_scores = stats['evaluation_scores']
         
-        for session_result in session_results:
-            if 'results' in session_result:
-                for turn_result in session_result['results']:
-                    total_turns += 1
-                    
-                    if turn_result['status'] == 'success':
-                        successful_turns += 1
-                        
-                        # Extract evaluation scores if available
-                        if 'results' in turn_result and 'evaluation_results' in turn_result['results']:
-                            eval_results = turn_result['results']['evaluation_results']
-                            if 'metrics_scores' in eval_results:
-                                for metric_name, metric_data in eval_results['metrics_scores'].items():
-                                    if 'score' in metric_data:
-                                        score = metric_data['score']
-                                        if metric_name.lower() in evaluation_scores:
-                                            evaluation_scores[metric_name.lower()].append(score)
+        if 'results' in session_result:
+            for turn_result in session_result['results']:
+                stats['total_turns'] += 1
+                
+                if turn_result['status'] == 'success':
+                    stats['successful_turns'] += 1
                     
-                    elif turn_result['status'] == 'failed':
-                        failed_turns += 1
-                    elif turn_result['status'] == 'error':
-                        error_turns += 1
+                    # Extract evaluation scores if available
+                    if 'results' in turn_result and 'evaluation_results' in turn_result['results']:
+                        eval_results = turn_result['results']['evaluation_results']
+                        if 'metrics_scores' in eval_results:
+                            for metric_name, metric_data in eval_results['metrics_scores'].items():
+                                key = metric_name.lower()
+                                if key in _ALLOWED_METRICS and 'score' in metric_data:
+                                    score = metric_data['score']
+                                    # Welford update of the running mean
+                                    running = evaluation_scores[key]
+                                    running[0] += 1
+                                    running[1] += (score - running[1]) / running[0]
+                
+                elif turn_result['status'] == 'failed':
+                    stats['failed_turns'] += 1
+                elif turn_result['status'] == 'error':
+                    stats['error_turns'] += 1
+    
+    def _generate_evaluation_summary(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate summary statistics from the accumulated running totals"""
+        total_turns = stats['total_turns']
+        successful_turns = stats['successful_turns']
         
-        # Calculate average scores
-        avg_scores = {}
-        for metric, scores in evaluation_scores.items():
-            if scores:
-                avg_scores[metric] = sum(scores) / len(scores)
-            else:
-                avg_scores[metric] = 0.0
+        # Running means are already the averages (0.0 when there were no scores)
+        avg_scores = {metric: mean for metric, (_, mean) in stats['evaluation_scores'].items()}
         
         return {
             'total_turns': total_turns,
             'successful_turns': successful_turns,
-            'failed_turns': failed_turns,
-            'error_turns': error_turns,
+            'failed_turns': stats['failed_turns'],
+            'error_turns': stats['error_turns'],
             'success_rate': successful_turns / total_turns if total_turns > 0 else 0.0,
             'average_scores': avg_scores,
-            'total_sessions': len(session_results)
+            'total_sessions': stats['total_sessions']
         }
 
-def run_concurrent_evaluation(data_file: str, max_workers: int = 5) -> Dict[str, Any]:
-    """Main function to run concurrent evaluations"""
-    logger.info("Starting concurrent evaluation framework")
+@functools.lru_cache(maxsize=None)
+def _process_config() -> Dict[str, Any]:
+    """Per-process config and clients for evaluations run in a ProcessPoolExecutor"""
+    return get_config()
+
+# Forked workers rebuild the config so they get their own clients (single_run
+# clears the cached Langfuse client the same way)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_process_config.cache_clear)
+
+def _evaluate_in_process(agent_info: Dict[str, Any], eval_kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Run one CPU_BOUND evaluation inside a worker process"""
+    config = _process_config()
+    try:
+        return create_evaluator(config=config, agent_info=agent_info, **eval_kwargs).run_evaluation()
+    finally:
+        # Worker processes exit without running atexit hooks
+        config['clients']['langfuse'].flush()
+
+def session_results_path(output_dir: str = '.') -> str:
+    """Timestamped per-run JSON Lines path under output_dir"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    return os.path.join(output_dir, f'session_results_{timestamp}.ndjson')
+
+def load_session_results(results_file: str) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Read a results_file back into the old 'sessions' and 'all_results' shapes
+    
+    run_concurrent_evaluation no longer returns those keys; per-session detail
+    is streamed to results_file instead.
+    """
+    sessions = []
+    all_results = {}
+    with open(results_file, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = _loads(line)
+            sessions.append(record)
+            if 'results' in record:
+                all_results[record['trajectory_id']] = {
+                    'session_id': record['session_id'],
+                    'results': record['results'],
+                    'context': record['context']
+                }
+    return sessions, all_results
+
+def run_concurrent_evaluation(data_file: str, max_workers: int = 5,
+                              executor_kind: str = 'thread',
+                              results_path: Optional[str] = None,
+                              output_dir: str = '.') -> Dict[str, Any]:
+    """Main function to run concurrent evaluations
+    
+    Per-session results are streamed to results_path as JSON Lines while the
+    run progresses (by default a new session_results_<timestamp>.ndjson under
+    output_dir); the returned dict carries the summary and that path as
+    'results_file'.
     
-    # Setup environment and config
-    setup_environment()
-    config = get_config()
+    executor_kind='process' runs every evaluation in a worker process. That only
+    pays off for CPU-heavy scoring; the Bedrock calls themselves are I/O-bound
+    and are best left on the default thread pool.
+    """
+    logger.info("Starting concurrent evaluation framework")
     
-    # Create orchestrator
-    orchestrator = ConcurrentEvaluationOrchestrator(config, max_workers)
+    # Langfuse is initialised once, by the orchestrator
+    config = get_config(max_concurrency=max_workers * DEFAULT_MAX_CONCURRENT_TURNS)
     
-    # Run evaluations
-    start_time = time.time()
-    results = orchestrator.run_concurrent_evaluations(data_file)
-    end_time = time.time()
+    # Create orchestrator and run evaluations
+    with ConcurrentEvaluationOrchestrator(config, max_workers, results_path=results_path,
+                                          executor_kind=executor_kind,
+                                          output_dir=output_dir) as orchestrator:
+        start_time = time.time()
+        results = asyncio.run(orchestrator.run_concurrent_evaluations(data_file))
+        end_time = time.time()
     
     results['execution_time'] = end_time - start_time
     results['max_workers'] = max_workers
@@ -19,3 +19,10 @@ DATA_FILE_PATH="data_files/DATA_FILE_NAME"
 LANGFUSE_PUBLIC_KEY=""
 LANGFUSE_SECRET_KEY=""
 LANGFUSE_HOST=""
+
+# Set to 1 to send a test trace to Langfuse at startup
+LANGFUSE_VERIFY="0"
+
+# Starting agent invocations per second for single_run.py (default 1/90);
+# the rate then adapts to throttling
+# AGENT_INVOKE_RATE="0.0111"
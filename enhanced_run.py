@@ -13,27 +13,29 @@ Usage:
     python enhanced_run.py --mode cicd --data-file data_files/data_file.json
 """
 
-import os
+from __future__ import annotations
+
 import sys
+import time
+import asyncio
+import string
 import argparse
+import dataclasses
 import logging
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, List, Optional
 from datetime import datetime
-from dotenv import load_dotenv
 
-# Import our enhanced components
-from concurrent_evaluator import run_concurrent_evaluation
-from hooks_system import create_default_hooks, HookType, HookContext
-from cicd_integration import CICDPipeline, QualityGate, create_cicd_workflow
+try:
+    import orjson
+except ImportError:  # fall back to stdlib json
+    orjson = None
 
-# Import original components
-from single_run import setup_environment, get_config, run_evaluation
+# The evaluation components pull in boto3, langfuse and the evaluators, so
+# they are imported inside the code paths that use them; --help and argument
+# errors never load the AWS SDK
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging is configured in main() once the level is known
 logger = logging.getLogger(__name__)
 
 class EnhancedEvaluationFramework:
@@ -42,32 +44,53 @@ class EnhancedEvaluationFramework:
     """
     
     def __init__(self, config: Dict[str, Any]):
+        from hooks_system import create_default_hooks, HookType, HookContext
+        
         self.config = config
         self.hooks_manager = create_default_hooks()
+        # Resolved once here so the run_* methods need no hooks_system lookups
+        self._hook_context = HookContext
+        self._pre = HookType.PRE_EVALUATION
+        self._post = HookType.POST_EVALUATION
         self.start_time = datetime.now()
+        # Durations come from the monotonic clock; wall-clock times are only for display
+        self._start_monotonic = time.monotonic()
+        self._start_iso = self.start_time.isoformat()
+        # CICDPipeline objects (and the AWS clients they hold) keyed by quality gate fields
+        self._pipelines: Dict[Any, CICDPipeline] = {}
+    
+    def _make_ctx(self, hook_type: HookType, **kwargs) -> HookContext:
+        """Build a framework-level HookContext stamped with the current time"""
+        return self._hook_context(hook_type=hook_type, timestamp=datetime.now(), **kwargs)
+        
+    def run_concurrent_mode(self, data_file: str, max_workers: int = 5,
+                            executor_kind: str = 'thread',
+                            results_path: Optional[str] = None,
+                            output_dir: str = '.') -> Dict[str, Any]:
+        """Run evaluation in concurrent mode with multi-turn conversations
+        
+        Session results are written to results_path (JSON Lines) as they complete;
+        without one, each run gets a timestamped file under output_dir.
+        """
+        from concurrent_evaluator import run_concurrent_evaluation
         
-    def run_concurrent_mode(self, data_file: str, max_workers: int = 5) -> Dict[str, Any]:
-        """Run evaluation in concurrent mode with multi-turn conversations"""
         logger.info("Starting concurrent evaluation mode")
         
         # Pre-evaluation hooks
-        pre_context = HookContext(
-            hook_type=HookType.PRE_EVALUATION,
-            data={'data_file': data_file, 'max_workers': max_workers},
-            timestamp=datetime.now()
-        )
-        pre_results = self.hooks_manager.execute_hooks(HookType.PRE_EVALUATION, pre_context)
+        pre_results = []
+        if self.hooks_manager.has_hooks(self._pre):
+            pre_context = self._make_ctx(self._pre, data={'data_file': data_file, 'max_workers': max_workers})
+            pre_results = self.hooks_manager.execute_hooks(self._pre, pre_context)
         
         # Run concurrent evaluation
-        results = run_concurrent_evaluation(data_file, max_workers)
+        results = run_concurrent_evaluation(data_file, max_workers, executor_kind,
+                                            results_path, output_dir)
         
         # Post-evaluation hooks
-        post_context = HookContext(
-            hook_type=HookType.POST_EVALUATION,
-            results=results,
-            timestamp=datetime.now()
-        )
-        post_results = self.hooks_manager.execute_hooks(HookType.POST_EVALUATION, post_context)
+        post_results = []
+        if self.hooks_manager.has_hooks(self._post):
+            post_context = self._make_ctx(self._post, results=results)
+            post_results = self.hooks_manager.execute_hooks(self._post, post_context)
         
         # Add hook results to evaluation results
         results['hooks'] = {
@@ -77,28 +100,59 @@ class EnhancedEvaluationFramework:
         
         return results
     
+    async def run_concurrent_mode_async(self, data_file: str, max_workers: int = 5,
+                                        executor_kind: str = 'thread',
+                                        results_path: Optional[str] = None,
+                                        output_dir: str = '.') -> Dict[str, Any]:
+        """Async variant of run_concurrent_mode for use inside an event loop
+        
+        Hooks run through HooksManager.aexecute_hooks and the evaluation itself
+        runs in a worker thread, so other coroutines keep making progress.
+        """
+        from concurrent_evaluator import run_concurrent_evaluation
+        
+        logger.info("Starting concurrent evaluation mode")
+        
+        pre_results = []
+        if self.hooks_manager.has_hooks(self._pre):
+            pre_context = self._make_ctx(self._pre, data={'data_file': data_file, 'max_workers': max_workers})
+            pre_results = await self.hooks_manager.aexecute_hooks(self._pre, pre_context)
+        
+        results = await asyncio.to_thread(run_concurrent_evaluation, data_file, max_workers,
+                                          executor_kind, results_path, output_dir)
+        
+        post_results = []
+        if self.hooks_manager.has_hooks(self._post):
+            post_context = self._make_ctx(self._post, results=results)
+            post_results = await self.hooks_manager.aexecute_hooks(self._post, post_context)
+        
+        results['hooks'] = {
+            'pre_evaluation': pre_results,
+            'post_evaluation': post_results
+        }
+        
+        return results
+    
     def run_sequential_mode(self, data_file: str) -> Dict[str, Any]:
         """Run evaluation in sequential mode (original behavior)"""
+        from single_run import run_evaluation
+        
         logger.info("Starting sequential evaluation mode")
         
         # Pre-evaluation hooks
-        pre_context = HookContext(
-            hook_type=HookType.PRE_EVALUATION,
-            data={'data_file': data_file, 'mode': 'sequential'},
-            timestamp=datetime.now()
-        )
-        pre_results = self.hooks_manager.execute_hooks(HookType.PRE_EVALUATION, pre_context)
+        pre_results = []
+        if self.hooks_manager.has_hooks(self._pre):
+            pre_context = self._make_ctx(self._pre, data={'data_file': data_file, 'mode': 'sequential'})
+            pre_results = self.hooks_manager.execute_hooks(self._pre, pre_context)
         
         # Run original evaluation
         run_evaluation(data_file)
         
         # Post-evaluation hooks
-        post_context = HookContext(
-            hook_type=HookType.POST_EVALUATION,
-            data={'mode': 'sequential'},
-            timestamp=datetime.now()
-        )
-        post_results = self.hooks_manager.execute_hooks(HookType.POST_EVALUATION, post_context)
+        post_results = []
+        if self.hooks_manager.has_hooks(self._post):
+            post_context = self._make_ctx(self._post, data={'mode': 'sequential'})
+            post_results = self.hooks_manager.execute_hooks(self._post, post_context)
         
         return {
             'mode': 'sequential',
@@ -112,8 +166,36 @@ class EnhancedEvaluationFramework:
         """Run evaluation in CI/CD mode with quality gates"""
         logger.info("Starting CI/CD evaluation mode")
         
-        pipeline = CICDPipeline(self.config, quality_gate)
-        return pipeline.run_evaluation_pipeline(data_file)
+        return self.get_pipeline(quality_gate).run_evaluation_pipeline(data_file)
+    
+    async def run_cicd_mode_async(self, data_file: str, quality_gate: QualityGate = None) -> Dict[str, Any]:
+        """Async variant of run_cicd_mode; the pipeline runs in a worker thread"""
+        return await asyncio.to_thread(self.run_cicd_mode, data_file, quality_gate)
+    
+    def get_pipeline(self, quality_gate: QualityGate = None) -> CICDPipeline:
+        """Return the CICDPipeline for a quality gate, reusing one built earlier
+        
+        QualityGate is a mutable dataclass and so not hashable; pipelines are
+        cached by the gate's field values instead.
+        """
+        from cicd_integration import CICDPipeline
+        
+        key = None if quality_gate is None else (
+            quality_gate.min_success_rate,
+            quality_gate.min_average_score,
+            quality_gate.max_execution_time,
+            quality_gate.max_failed_turns,
+            tuple(quality_gate.required_metrics or ()),
+        )
+        pipeline = self._pipelines.get(key)
+        if pipeline is None:
+            # The pipeline keeps its own copy, so later edits to the caller's
+            # gate cannot change a pipeline shared under the old thresholds
+            if quality_gate is not None:
+                quality_gate = dataclasses.replace(
+                    quality_gate, required_metrics=list(quality_gate.required_metrics or ()))
+            pipeline = self._pipelines[key] = CICDPipeline(self.config, quality_gate)
+        return pipeline
     
     def add_custom_hook(self, hook_name: str, hook_type: HookType, hook_function, priority: int = 0):
         """Add a custom hook to the framework"""
@@ -121,17 +203,17 @@ class EnhancedEvaluationFramework:
         
         custom_hook = CustomHook(hook_name, hook_type, hook_function, priority)
         self.hooks_manager.register_hook(custom_hook)
-        logger.info(f"Added custom hook: {hook_name}")
+        logger.info("Added custom hook: %s", hook_name)
     
     def get_execution_summary(self) -> Dict[str, Any]:
         """Get execution summary including hook statistics"""
+        duration = time.monotonic() - self._start_monotonic
         end_time = datetime.now()
-        duration = (end_time - self.start_time).total_seconds()
         
         hook_summary = self.hooks_manager.get_execution_summary()
         
         return {
-            'start_time': self.start_time.isoformat(),
+            'start_time': self._start_iso,
             'end_time': end_time.isoformat(),
             'duration': duration,
             'hook_summary': hook_summary
@@ -139,6 +221,8 @@ class EnhancedEvaluationFramework:
 
 def create_quality_gate_from_args(args) -> QualityGate:
     """Create quality gate from command line arguments"""
+    from cicd_integration import QualityGate
+    
     return QualityGate(
         min_success_rate=args.min_success_rate,
         min_average_score=args.min_average_score,
@@ -146,8 +230,13 @@ def create_quality_gate_from_args(args) -> QualityGate:
         max_failed_turns=args.max_failed_turns
     )
 
-def setup_argument_parser() -> argparse.ArgumentParser:
-    """Setup command line argument parser"""
+_MODES = ('concurrent', 'sequential', 'cicd')
+
+# Parsers already built, keyed by mode (None is the full parser)
+_PARSERS: Dict[Optional[str], argparse.ArgumentParser] = {}
+
+def _build_common_parser() -> argparse.ArgumentParser:
+    """Parser with the arguments shared by every mode"""
     parser = argparse.ArgumentParser(
         description='Enhanced Agent Evaluation Framework',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -177,6 +266,16 @@ Examples:
         help='Path to the data file containing evaluation questions'
     )
     
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+    
+    return parser
+
+def _add_concurrent_args(parser: argparse.ArgumentParser) -> None:
+    """Arguments used by concurrent mode"""
     parser.add_argument(
         '--max-workers',
         type=int,
@@ -184,7 +283,23 @@ Examples:
         help='Maximum number of concurrent workers (default: 5)'
     )
     
-    # Quality gate arguments
+    parser.add_argument(
+        '--executor-kind',
+        choices=['thread', 'process'],
+        default='thread',
+        help='Run evaluations in threads or worker processes; processes only help '
+             'CPU-bound evaluators (default: thread)'
+    )
+    
+    parser.add_argument(
+        '--output-jsonl',
+        default=None,
+        help='JSON Lines file that per-session results are streamed to '
+             '(default: a new session_results_<timestamp>.ndjson in --output-dir)'
+    )
+
+def _add_cicd_args(parser: argparse.ArgumentParser) -> None:
+    """Quality gate arguments used by CI/CD mode"""
     parser.add_argument(
         '--min-success-rate',
         type=float,
@@ -212,8 +327,9 @@ Examples:
         default=5,
         help='Maximum number of failed turns (default: 5)'
     )
-    
-    # Output options
+
+def _add_output_args(parser: argparse.ArgumentParser) -> None:
+    """Output and CI platform arguments"""
     parser.add_argument(
         '--output-dir',
         default='evaluation_results',
@@ -235,53 +351,107 @@ Examples:
     )
     
     parser.add_argument(
-        '--verbose',
+        '--skip-artifact',
         action='store_true',
-        help='Enable verbose logging'
+        help='Do not write the results file (e.g. when only CI outputs are needed)'
     )
-    
+
+def _sniff_mode(argv: List[str]) -> Optional[str]:
+    """Read --mode from argv without argparse; None for --help or an unrecognised mode"""
+    mode = 'concurrent'
+    for i, arg in enumerate(argv):
+        if arg in ('-h', '--help'):
+            return None
+        if arg == '--mode':
+            mode = argv[i + 1] if i + 1 < len(argv) else None
+        elif arg.startswith('--mode='):
+            mode = arg.split('=', 1)[1]
+    return mode if mode in _MODES else None
+
+def setup_argument_parser(mode: Optional[str] = None) -> argparse.ArgumentParser:
+    """Setup command line argument parser, limited to one mode's arguments if given"""
+    parser = _PARSERS.get(mode)
+    if parser is None:
+        parser = _build_common_parser()
+        if mode in (None, 'concurrent'):
+            _add_concurrent_args(parser)
+        if mode in (None, 'cicd'):
+            _add_cicd_args(parser)
+        _add_output_args(parser)
+        _PARSERS[mode] = parser
     return parser
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse arguments with the parser for the sniffed mode, falling back to the full parser"""
+    argv = sys.argv[1:] if argv is None else argv
+    mode = _sniff_mode(argv)
+    if mode is not None:
+        args, unknown = setup_argument_parser(mode).parse_known_args(argv)
+        if not unknown and args.mode == mode:
+            return args
+    # --help, an unclear --mode, or arguments belonging to another mode
+    return setup_argument_parser().parse_args(argv)
+
+def _dump_json(results: Dict[str, Any], output_file: Path) -> None:
+    if orjson is not None:
+        output_file.write_bytes(
+            orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        )
+    else:
+        import json
+        with open(output_file, 'w') as f:
+            json.dump(results, f, indent=2)
+
+def _dump_yaml(results: Dict[str, Any], output_file: Path) -> None:
+    # PyYAML is only loaded when YAML output was asked for
+    import yaml
+    # libyaml's C emitter when PyYAML was built with it
+    dumper = getattr(yaml, 'CDumper', yaml.Dumper)
+    with open(output_file, 'w') as f:
+        yaml.dump(results, f, Dumper=dumper, default_flow_style=False)
+
+def _dump_markdown(results: Dict[str, Any], output_file: Path) -> None:
+    output_file.write_text(generate_markdown_report(results))
+
+# output format -> (file extension, serializer)
+_SERIALIZERS = {
+    'json': ('json', _dump_json),
+    'yaml': ('yaml', _dump_yaml),
+    'markdown': ('md', _dump_markdown),
+}
+
 def save_results(results: Dict[str, Any], output_dir: str, output_format: str = 'json'):
     """Save evaluation results to files"""
-    import json
-    import yaml
-    from pathlib import Path
+    ext, dump = _SERIALIZERS[output_format]
     
     # Create output directory
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    base = Path(output_dir)
+    base.mkdir(parents=True, exist_ok=True)
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_file = base / f'evaluation_results_{timestamp}.{ext}'
     
     # Save main results
-    if output_format == 'json':
-        output_file = os.path.join(output_dir, f'evaluation_results_{timestamp}.json')
-        with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2)
-    elif output_format == 'yaml':
-        output_file = os.path.join(output_dir, f'evaluation_results_{timestamp}.yaml')
-        with open(output_file, 'w') as f:
-            yaml.dump(results, f, default_flow_style=False)
-    elif output_format == 'markdown':
-        output_file = os.path.join(output_dir, f'evaluation_results_{timestamp}.md')
-        with open(output_file, 'w') as f:
-            f.write(generate_markdown_report(results))
+    dump(results, output_file)
     
-    logger.info(f"Results saved to {output_file}")
-    return output_file
+    logger.info("Results saved to %s", output_file)
+    return str(output_file)
 
-def generate_markdown_report(results: Dict[str, Any]) -> str:
-    """Generate markdown report from results"""
-    report = f"""# Agent Evaluation Results
+_STATUS_ICON = {'success': '✅'}
+
+_REPORT_TMPL = string.Template("""# Agent Evaluation Results
 
-**Timestamp:** {datetime.now().isoformat()}
+**Timestamp:** $timestamp
 
 ## Summary
-"""
-    
+$summary_block$hooks_block""")
+
+def generate_markdown_report(results: Dict[str, Any]) -> str:
+    """Generate markdown report from results"""
+    summary_parts = []
     if 'summary' in results:
         summary = results['summary']
-        report += f"""
+        summary_parts.append(f"""
 - **Total Sessions:** {summary.get('total_sessions', 'N/A')}
 - **Total Turns:** {summary.get('total_turns', 'N/A')}
 - **Success Rate:** {summary.get('success_rate', 0.0):.2%}
@@ -289,38 +459,48 @@ def generate_markdown_report(results: Dict[str, Any]) -> str:
 - **Execution Time:** {results.get('execution_time', 0.0):.2f} seconds
 
 ## Average Scores
-"""
+""")
         
         avg_scores = summary.get('average_scores', {})
         for metric, score in avg_scores.items():
-            report += f"- **{metric}:** {score:.3f}\n"
+            summary_parts.append(f"- **{metric}:** {score:.3f}\n")
     
+    hooks_parts = []
     if 'hooks' in results:
-        report += "\n## Hook Execution Summary\n"
+        hooks_parts.append("\n## Hook Execution Summary\n")
         hooks = results['hooks']
         
         for hook_type, hook_results in hooks.items():
-            report += f"\n### {hook_type.replace('_', ' ').title()}\n"
+            hooks_parts.append(f"\n### {hook_type.replace('_', ' ').title()}\n")
             for result in hook_results:
-                status = "✅" if result['status'] == 'success' else "❌"
-                report += f"- {status} {result['hook_name']}: {result['status']}\n"
+                status = _STATUS_ICON.get(result['status'], '❌')
+                hooks_parts.append(f"- {status} {result['hook_name']}: {result['status']}\n")
     
-    return report
+    return _REPORT_TMPL.substitute(
+        timestamp=datetime.now().isoformat(),
+        summary_block="".join(summary_parts),
+        hooks_block="".join(hooks_parts)
+    )
 
-def main():
-    """Main entry point"""
+def main() -> int:
+    """Main entry point; returns the process exit code"""
+    # Parse arguments
+    args = parse_args()
+    
     # Load environment variables
+    from dotenv import load_dotenv
     load_dotenv('config.env')
     
-    # Parse arguments
-    parser = setup_argument_parser()
-    args = parser.parse_args()
-    
-    # Set logging level
-    if args.verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
+    # Configure logging at the requested level before anything logs
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        force=True
+    )
     
     try:
+        from single_run import setup_environment, get_config
+        
         # Setup environment and config
         logger.info("Setting up evaluation environment...")
         setup_environment()
@@ -330,10 +510,12 @@ def main():
         framework = EnhancedEvaluationFramework(config)
         
         # Run evaluation based on mode
-        logger.info(f"Running evaluation in {args.mode} mode...")
+        logger.info("Running evaluation in %s mode...", args.mode)
         
         if args.mode == 'concurrent':
-            results = framework.run_concurrent_mode(args.data_file, args.max_workers)
+            results = framework.run_concurrent_mode(args.data_file, args.max_workers,
+                                                    args.executor_kind, args.output_jsonl,
+                                                    args.output_dir)
         elif args.mode == 'sequential':
             results = framework.run_sequential_mode(args.data_file)
         elif args.mode == 'cicd':
@@ -342,23 +524,28 @@ def main():
         
         # Add execution summary
         results['execution_summary'] = framework.get_execution_summary()
+        summary = results.get('summary') or {}
+        success_rate = summary.get('success_rate', 0.0)
+        status = results.get('status', 'unknown')
         
         # Save results
-        output_file = save_results(results, args.output_dir, args.output_format)
+        output_file = None if args.skip_artifact else save_results(results, args.output_dir, args.output_format)
         
         # CI/CD platform integration
         if args.ci_platform != 'none':
-            logger.info(f"Integrating with {args.ci_platform} CI/CD platform...")
+            logger.info("Integrating with %s CI/CD platform...", args.ci_platform)
             if args.ci_platform == 'github':
                 from cicd_integration import GitHubActionsIntegration
-                GitHubActionsIntegration.set_output('status', results.get('status', 'unknown'))
-                GitHubActionsIntegration.set_output('success_rate', 
-                                                  str(results.get('summary', {}).get('success_rate', 0.0)))
+                GitHubActionsIntegration.set_outputs({
+                    'status': status,
+                    'success_rate': str(success_rate)
+                })
             elif args.ci_platform == 'gitlab':
                 from cicd_integration import GitLabCIIntegration
-                GitLabCIIntegration.set_variable('EVALUATION_STATUS', results.get('status', 'unknown'))
-                GitLabCIIntegration.set_variable('SUCCESS_RATE', 
-                                               str(results.get('summary', {}).get('success_rate', 0.0)))
+                GitLabCIIntegration.set_variables({
+                    'EVALUATION_STATUS': status,
+                    'SUCCESS_RATE': str(success_rate)
+                })
         
         # Print summary
         print("\n" + "="*50)
@@ -366,30 +553,27 @@ def main():
         print("="*50)
         
         if 'summary' in results:
-            summary = results['summary']
             print(f"Total Sessions: {summary.get('total_sessions', 'N/A')}")
             print(f"Total Turns: {summary.get('total_turns', 'N/A')}")
-            print(f"Success Rate: {summary.get('success_rate', 0.0):.2%}")
+            print(f"Success Rate: {success_rate:.2%}")
             print(f"Execution Time: {results.get('execution_time', 0.0):.2f} seconds")
         
         if 'status' in results:
             print(f"Pipeline Status: {results['status']}")
         
-        print(f"Results saved to: {output_file}")
+        if output_file:
+            print(f"Results saved to: {output_file}")
         print("="*50)
         
         # Exit with appropriate code
-        if results.get('status') == 'failed':
-            sys.exit(1)
-        else:
-            sys.exit(0)
+        return 1 if status == 'failed' else 0
             
     except KeyboardInterrupt:
         logger.info("Evaluation interrupted by user")
-        sys.exit(1)
-    except Exception as e:
-        logger.error(f"Evaluation failed: {str(e)}")
-        sys.exit(1)
+        return 1
+    except Exception:
+        logger.exception("Evaluation failed")
+        return 1
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    raise SystemExit(main())
@@ -0,0 +1,27 @@
+import os
+import functools
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+
+_LOADED = False
+
+def load_once(path: str = 'config.env') -> None:
+    """Load the dotenv file the first time it is requested"""
+    global _LOADED
+    if not _LOADED:
+        load_dotenv(path)
+        _LOADED = True
+        # Lookups made before the file was loaded must not stay cached
+        env.cache_clear()
+        host_netloc.cache_clear()
+
+@functools.lru_cache(maxsize=None)
+def env(name: str, default=None):
+    """Cached environment variable lookup"""
+    return os.environ.get(name, default)
+
+@functools.lru_cache(maxsize=None)
+def host_netloc(name: str = 'LANGFUSE_HOST') -> str:
+    """Host part of a URL-valued environment variable, parsed once"""
+    parsed = urlsplit(env(name) or '')
+    return parsed.netloc or parsed.path
@@ -1,13 +1,101 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, NamedTuple, Optional, Set, Tuple
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
 from langfuse import Langfuse
 import helpers.cot_helper as cot_helper
+import os
 import time
-import json
 import re
+import logging
+from botocore.exceptions import ClientError, NoCredentialsError
+
+try:
+    from orjson import dumps as _dumps, loads as _loads
+except ImportError:  # fall back to stdlib json
+    from json import dumps as _dumps, loads as _loads
+
+logger = logging.getLogger(__name__)
+
+# Error codes that would fail every remaining evaluation in the same way
+_FATAL_ERROR_CODES = frozenset({
+    'AccessDeniedException',
+    'UnrecognizedClientException',
+    'ExpiredTokenException',
+    'InvalidSignatureException',
+    'ResourceNotFoundException'
+})
+
+# Error codes Bedrock uses for throttling (the agent runtime spells it lower-case)
+_THROTTLING_ERROR_CODES = frozenset({'ThrottlingException', 'throttlingException'})
+
+# Orchestration trace steps that carry the step's traceId
+_TRACE_ID_STEPS = ('modelInvocationInput', 'modelInvocationOutput', 'rationale', 'observation')
+
+# Trailing trajectory number, e.g. "Trajectory12" -> "12"
+_TRAJ_RE = re.compile(r'(\d+)$')
+
+class FatalEvalError(Exception):
+    """Evaluation failed on an auth/config error, so further evaluations are pointless"""
+
+def is_fatal_error(error: Exception) -> bool:
+    """Whether an exception is an auth/config failure rather than a per-question one"""
+    if isinstance(error, NoCredentialsError):
+        return True
+    response = getattr(error, 'response', None)
+    return isinstance(response, dict) and response.get('Error', {}).get('Code') in _FATAL_ERROR_CODES
+
+def is_throttling_error(error: Exception) -> bool:
+    """Whether an exception is Bedrock throttling the request"""
+    response = getattr(error, 'response', None)
+    return isinstance(response, dict) and response.get('Error', {}).get('Code') in _THROTTLING_ERROR_CODES
+
+def _find_trace_id(cur_trace):
+    """traceId of a trace event, read from the known orchestration paths first"""
+    orc_trace = cur_trace.get('trace', {}).get('orchestrationTrace', {})
+    for step_key in _TRACE_ID_STEPS:
+        trace_id = orc_trace.get(step_key, {}).get('traceId')
+        if trace_id:
+            return trace_id
+    
+    # Other trace types: depth-first search without recursion
+    stack = [cur_trace]
+    while stack:
+        data = stack.pop()
+        if isinstance(data, dict):
+            if data.get('traceId'):
+                return data['traceId']
+            stack.extend(reversed(list(data.values())))
+        elif isinstance(data, list):
+            stack.extend(reversed(data))
+    return None
+
+class TraceDigest(NamedTuple):
+    """What run_evaluation needs from an agent trace, filled in as trace events arrive"""
+    # One step dict per trace ID, in order of first appearance
+    steps_by_id: Dict[Any, Dict[str, Any]]
+    rationales: List[str]
+    agents_used: Set[str]
+    multi_agent: bool
+    # trace ID -> [first, last] eventTime of the events seen for that step
+    step_times: Dict[Any, List[datetime]]
+    
+    @property
+    def trace_step_spans(self) -> List[Dict[str, Any]]:
+        return list(self.steps_by_id.values())
 
 class ToolEvaluator(ABC):
+    # Evaluators are I/O-bound and run on the orchestrator's thread pool; set
+    # True on a subclass doing heavy local computation to run it in a process
+    CPU_BOUND: bool = False
+    # Langfuse calls whose return value is not needed (span ends, scores,
+    # trace updates) go to one background worker shared by every evaluator,
+    # so the evaluation thread does not pay for the SDK's serialization and
+    # the calls stay in submission order
+    _tg_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='langfuse')
+    
     def __init__(self, 
                  config: Dict[str, Any],
                  agent_info: Dict[str, Any],
@@ -41,7 +129,17 @@ class ToolEvaluator(ABC):
         self.question_id = question_id
         self.trajectory_id = trajectory_id
         self.clients = config.get('clients', {})
-        self.langfuse = Langfuse()
+        # The shared client is flushed at interpreter exit; a client created
+        # here is batched and flushed once per evaluation instead
+        self.langfuse = self.clients.get('langfuse')
+        self._owns_langfuse = self.langfuse is None
+        if self._owns_langfuse:
+            self.langfuse = Langfuse(flush_at=512, flush_interval=5.0)
+        # This evaluator's pending calls on the shared pool, for _drain_langfuse
+        self._langfuse_ops = []
+        # Set when run_evaluation returned None because Bedrock throttled it,
+        # so callers pacing requests can back off
+        self.throttled = False
         
         self._initialize_clients()
 
@@ -77,50 +175,67 @@ class ToolEvaluator(ABC):
         pass
 
     def _add_agent_collaborators(self, agents_used, trimmed_orc_trace):
-
-        for item in trimmed_orc_trace:
-            # Check for invocationInput
-            if 'invocationInput' in item:
-                if 'agentCollaboratorInvocationInput' in item['invocationInput']:
-                    name = item['invocationInput']['agentCollaboratorInvocationInput']['agentCollaboratorName']
-                    agents_used.add(name)
-            
-            # Check for observation with agentCollaboratorInvocationOutput
-            if 'observation' in item:
-                if 'agentCollaboratorInvocationOutput' in item['observation']:
-                    name = item['observation']['agentCollaboratorInvocationOutput']['agentCollaboratorName']
-                    agents_used.add(name)
-
+        """Add the collaborator agents named in invocation inputs and observations"""
+        agents_used.update(
+            name
+            for item in trimmed_orc_trace
+            for collaborator in (
+                item.get('invocationInput', {}).get('agentCollaboratorInvocationInput'),
+                item.get('observation', {}).get('agentCollaboratorInvocationOutput')
+            )
+            if collaborator and (name := collaborator.get('agentCollaboratorName'))
+        )
         return agents_used
 
-        # print("Collaborators Used for Question: {}".format(collaborator_names))
+    @cached_property
+    def _traj_num(self) -> str:
+        """Trailing number of the trajectory id, used in trace names"""
+        match = _TRAJ_RE.search(self.trajectory_id)
+        return match.group(1) if match else '0'
 
     def _create_trace(self) -> Any:
         """Create and initialize a Langfuse trace"""
-        traj_num = re.findall(r'\d+$', self.trajectory_id)[0]
-
         return self.langfuse.trace(
             id=self.trace_id,
             session_id=self.session_id,
             input=self.question,
-            name=f"T{traj_num}-Q{self.question_id}-{self.eval_type}",
+            name=f"T{self._traj_num}-Q{self.question_id}-{self.eval_type}",
             user_id=self.config['AGENT_ID'],
             tags=[self.eval_type, self.agent_info['agentModel'], self.agent_info['agentType']]
         )
 
 
+    def _post_langfuse(self, fn, *args, **kwargs) -> None:
+        """Run a Langfuse call on the background pool"""
+        self._langfuse_ops.append(self._tg_pool.submit(fn, *args, **kwargs))
+
+    def _drain_langfuse(self) -> None:
+        """Wait for this evaluator's background Langfuse calls to finish"""
+        ops, self._langfuse_ops = self._langfuse_ops, []
+        for op in ops:
+            error = op.exception()
+            if error is not None:
+                logger.warning("Langfuse call failed: %s", error)
+
+    def _flush_langfuse(self) -> None:
+        """Send queued Langfuse events in one batch if this evaluator owns the client"""
+        self._drain_langfuse()
+        if self._owns_langfuse:
+            self.langfuse.flush()
+
     def _handle_error(self, trace: Any, error: Exception, stage: str) -> None:
         """Handle and log errors during evaluation without raising"""
-        traj_num = re.findall(r'\d+$', self.trajectory_id)[0]
-
+        # Earlier background updates must not land after the error update
+        self._drain_langfuse()
         error_message = f"{stage} error: {str(error)}"
         trace.update(
-            name=f"[ERROR] T{traj_num}-Q{self.question_id}-{self.eval_type}",
+            name=f"[ERROR] T{self._traj_num}-Q{self.question_id}-{self.eval_type}",
             metadata={"errorMessage": error_message},
             output={"Agent Error": error_message},
             tags=["ERROR"]
         )
-        print(f"Error in {stage}: {error_message}")
+        self._flush_langfuse()
+        logger.error("Error in %s: %s", stage, error_message)
 
 
     def process_trace_step(self,trace_step):
@@ -132,8 +247,8 @@ class ToolEvaluator(ABC):
 
             orchestration_trace = {
                 'name': 'Orchestration',
-                'input': json.loads(trace['modelInvocationInput'].get('text', '{}')),
-                'output': json.loads(trace['modelInvocationOutput']['rawResponse'].get('content', '{}')),
+                'input': _loads(trace['modelInvocationInput'].get('text', '{}')),
+                'output': _loads(trace['modelInvocationOutput']['rawResponse'].get('content', '{}')),
                 'metadata': trace['modelInvocationOutput'].get('metadata', {}),
                 'trace_id': trace['modelInvocationInput'].get('traceId')
             }
@@ -147,62 +262,73 @@ class ToolEvaluator(ABC):
             return orchestration_trace
 
     def combine_traces(self,full_trace):
-        
-        trace_ids = []
-        trace_steps = []
-        cur_dict = {}
-
-        def find_trace_id(data):
-            if isinstance(data, dict):
-                # If traceId is directly in this dictionary, return it
-                if 'traceId' in data:
-                    return data['traceId']
-                # Otherwise search through all values in the dictionary
-                for value in data.values():
-                    result = find_trace_id(value)
-                    if result:
-                        return result
-            # If the value is a list, search through its elements
-            elif isinstance(data, list):
-                for item in data:
-                    result = find_trace_id(item)
-                    if result:
-                        return result
-            return None
-            
-        #iterate through all the traces
+        """Combine all the traces with the same trace ID into one step dict each"""
+        return self._digest_trace(full_trace).trace_step_spans
+
+    def _new_trace_digest(self) -> TraceDigest:
+        """Empty digest for _ingest_trace_event to fill"""
+        return TraceDigest({}, [], {self.agent_info['agentName']},
+                           self.agent_info['agentType'] == "MULTI-AGENT", {})
+
+    def _digest_trace(self, full_trace) -> TraceDigest:
+        """Digest an already collected list of trace events"""
+        digest = self._new_trace_digest()
         for cur_trace in full_trace:
-            
-            cur_trace_id = find_trace_id(cur_trace)
-            #LOGIC FOR INITIALIZING NEW DICTIONARY
-            #only for the first instsance of a single trace ID
-            if cur_trace_id not in trace_ids: 
-                # print("Unique trace ID: {}".format(cur_trace_id))
-                #initialize new dict with the agent information
-                if cur_dict:
-                    trace_steps.append(cur_dict)
-                    cur_dict = {}
-                    
-                cur_dict = {key: value for key, value in cur_trace.items() if key != 'trace'}
-                
-                # print("Unique dict: {}".format(cur_dict))
-                trace_ids.append(cur_trace_id)
-                
-            #LOGIC FOR ADDING TO EXISTING DICTIOANRY
-            #append to cur_dict what's in trace.anytracetype (orchestrationTrace) and put the whole thing in there
-            
-            if 'orchestrationTrace' in cur_trace['trace']:
-                first_key = next(iter(cur_trace['trace']['orchestrationTrace']))
-                cur_dict[first_key] = cur_trace['trace']['orchestrationTrace'][first_key]
+            self._ingest_trace_event(cur_trace, digest)
+        return digest
+
+    def _ingest_trace_event(self, cur_trace, digest: TraceDigest) -> None:
+        """Fold one trace event into the digest: group its step, collect rationale and collaborators"""
+        steps_by_id = digest.steps_by_id
+        cur_trace_id = _find_trace_id(cur_trace)
+        cur_dict = steps_by_id.get(cur_trace_id)
+        #LOGIC FOR INITIALIZING NEW DICTIONARY
+        #only for the first instsance of a single trace ID
+        if cur_dict is None:
+            #initialize new dict with the agent information
+            cur_dict = steps_by_id[cur_trace_id] = cur_trace.copy()
+            cur_dict.pop('trace', None)
         
-        if cur_dict:
-            trace_steps.append(cur_dict)
+        # Real event times, so the step spans get their true start and end
+        event_time = cur_trace.get('eventTime')
+        if isinstance(event_time, datetime):
+            if event_time.tzinfo is None:
+                event_time = event_time.replace(tzinfo=timezone.utc)
+            times = digest.step_times.get(cur_trace_id)
+            if times is None:
+                digest.step_times[cur_trace_id] = [event_time, event_time]
+            else:
+                times[0] = min(times[0], event_time)
+                times[1] = max(times[1], event_time)
+            
+        #LOGIC FOR ADDING TO EXISTING DICTIOANRY
+        #append to cur_dict what's in trace.anytracetype (orchestrationTrace) and put the whole thing in there
+        orc_trace = cur_trace['trace'].get('orchestrationTrace')
+        if orc_trace is None:
+            return
 
-        return trace_steps
+        first_key = next(iter(orc_trace))
+        cur_dict[first_key] = orc_trace[first_key]
+
+        # Rationales make up the chain of thought for the COT judge
+        rationale = orc_trace.get('rationale')
+        if rationale and 'text' in rationale:
+            digest.rationales.append(rationale['text'])
+
+        # Add collaborator agents if multi-agent in use
+        if digest.multi_agent:
+            self._add_agent_collaborators(digest.agents_used, (orc_trace,))
 
 
     def run_evaluation(self) -> Dict[str, Any]:
         """Run the complete evaluation pipeline"""
+        # Config and agent fields used throughout, looked up once
+        config = self.config
+        agent_info = self.agent_info
+        question = self.question
+        eval_type = self.eval_type
+        model_id_eval_cot = config['MODEL_ID_EVAL_COT']
+        
         trace = self._create_trace()
 
         # Invoke try block
@@ -210,17 +336,20 @@ class ToolEvaluator(ABC):
             
             # Invoke tool and get processed response
             full_trace, processed_response, agent_start_time = self.invoke_agent()
+            # Evaluators that stream the trace return a digest; the others a list of events
+            digest = full_trace if isinstance(full_trace, TraceDigest) else None
 
             #if there is no response, then raise an error
             if not processed_response or not processed_response.get('agent_answer'):
                 self._handle_error(trace, Exception("Failed to get or process agent response"), "Agent Processing")
                 return None
 
-            trace.update(
+            self._post_langfuse(
+                trace.update,
                 metadata={
                     "Ground Truth": self.ground_truth,
-                    str(self.eval_type + " Evaluation Model"): self.config['MODEL_ID_EVAL'],
-                    "Chain of Thought Evaluation Model": self.config['MODEL_ID_EVAL_COT']
+                    str(eval_type + " Evaluation Model"): config['MODEL_ID_EVAL'],
+                    "Chain of Thought Evaluation Model": model_id_eval_cot
                 },
                 output=processed_response['agent_answer'] 
             )
@@ -228,41 +357,33 @@ class ToolEvaluator(ABC):
             # Evaluation try block
             try:
                 
-                # Eliminate unneeded information for COT evaluation
-                orc_trace_full = [item['trace']['orchestrationTrace'] for item in full_trace if 'orchestrationTrace' in item['trace']]
-                
-                #Combine all the traces with the same trace ID
-                trace_step_spans = self.combine_traces(full_trace)
-
-                trimmed_orc_trace = [item['rationale']['text'] for item in orc_trace_full if 'rationale' in item]
-
-                trace_steps = ""
-                for i, item in enumerate(trimmed_orc_trace, 1):
-                    trace_steps += f"Step {i}: {item}\n"
-
-                agents_used = {self.agent_info['agentName']}
+                # Step spans, rationales and agents used, from one pass over the trace
+                if digest is None:
+                    digest = self._digest_trace(full_trace)
+                trace_step_spans = digest.trace_step_spans
+                trimmed_orc_trace = digest.rationales
+                agents_used = digest.agents_used
 
-                # Add collaborator agents if multi-agent in use
-                if self.agent_info['agentType'] == "MULTI-AGENT":
-                    agents_used = self._add_agent_collaborators(agents_used, orc_trace_full)
+                trace_steps = "".join(f"Step {i}: {item}\n" for i, item in enumerate(trimmed_orc_trace, 1))
 
                 # Chain of thought processes whole agent trace + agent info
-                cot_eval_results, cot_system_prompt = cot_helper.evaluate_cot(trace_steps, processed_response['agent_answer'],self.agent_info, self.clients['bedrock_runtime'], self.config['MODEL_ID_EVAL_COT'])
+                cot_eval_results, cot_system_prompt = cot_helper.evaluate_cot(trace_steps, processed_response['agent_answer'],agent_info, self.clients['bedrock_runtime'], model_id_eval_cot)
                 
                 # Create an evaluation generation
                 agent_generation = trace.generation(
                     name= "Agent Generation Information",
                     input=[
-                        {"role": "system", "content": self.agent_info['agentInstruction']},
-                        {"role": "user", "content": self.question}
+                        {"role": "system", "content": agent_info['agentInstruction']},
+                        {"role": "user", "content": question}
                     ],
-                    model=self.agent_info['agentModel'],
-                    model_parameters={"temperature": self.config['TEMPERATURE']},
+                    model=agent_info['agentModel'],
+                    model_parameters={"temperature": config['TEMPERATURE']},
                     start_time=agent_start_time,
                     metadata=processed_response.get('agent_generation_metadata')
                 )
 
-                agent_generation.end(
+                self._post_langfuse(
+                    agent_generation.end,
                     output=processed_response.get('agent_answer'),
                     usage_details={
                         "input": processed_response.get('input_tokens'),
@@ -272,23 +393,34 @@ class ToolEvaluator(ABC):
 
                 #CHAIN OF THOUGHT EVALUATION SECTION START 
 
-                # Create generation based on CoT output
+                # Step spans use the trace's own event times; steps without
+                # them get strictly increasing 1 ms slots so their order holds
+                now = datetime.now(timezone.utc)
+                span_times = []
+                for index, step_id in enumerate(digest.steps_by_id):
+                    first, last = digest.step_times.get(step_id) or (None, None)
+                    start = first or now + timedelta(milliseconds=index)
+                    span_times.append((start, max(last or start, start + timedelta(milliseconds=1))))
+                
+                # Create generation based on CoT output; it spans all of its step spans
                 cot_generation = trace.generation(
                     name="CoT Evaluation LLM-As-Judge Generation",
                     input=[
                         {"role": "system", "content": cot_system_prompt},
-                        {"role": "user", "content": self.question}
+                        {"role": "user", "content": question}
                     ],
                     output=cot_eval_results,
-                    metadata={"agents_used": agents_used, 'model_used': self.config['MODEL_ID_EVAL_COT']}
+                    metadata={"agents_used": agents_used, 'model_used': model_id_eval_cot},
+                    start_time=min([now] + [start for start, _ in span_times])
                 )
 
 
-                for index, step in enumerate(trace_step_spans):                     
+                for index, (step, (span_start, span_end)) in enumerate(zip(trace_step_spans, span_times)):
                         
                     # Create trace step spans
                     subtrace_span = cot_generation.span(
                         name="Agent Trace Step {}".format(index+1),
+                        start_time=span_start,
                         input = step.get('modelInvocationInput'),
                         output={'Model Raw Response': step.get('modelInvocationOutput', {}).get('rawResponse'), 
                                 "Model Rationale": step.get('rationale')},
@@ -296,46 +428,47 @@ class ToolEvaluator(ABC):
                                     "Observation": step.get('observation')}
                     )           
 
-                    subtrace_span.end()
-
-                    # Prevents trace spans from getting sent out of order
-                    time.sleep(1)
+                    self._post_langfuse(subtrace_span.end, end_time=span_end)
 
-                cot_generation.end()
+                # End no earlier than the last step span, nor than now
+                self._post_langfuse(cot_generation.end,
+                                    end_time=max([datetime.now(timezone.utc)] + [end for _, end in span_times]))
                 
                 #Send the scores of chain of thought evaluation
-                for metric_name, value in cot_eval_results.items():
-                    cot_generation.score(
-                        name=str("COT_" + metric_name),
-                        value=value['score'],
-                        comment = value['explanation'],
-                    )
+                cot_scores = [
+                    ("COT_" + metric_name, value['score'], value['explanation'])
+                    for metric_name, value in cot_eval_results.items()
+                ]
+                for name, score, comment in cot_scores:
+                    self._post_langfuse(cot_generation.score, name=name, value=score, comment=comment)
 
                 #CHAIN OF THOUGHT EVALUATION END
                 
                 
                 #AGENT EVALAUATION RESULTS START
 
-                # Prepare metadata and evaluate
-                evaluation_metadata = {
-                    'question': self.question,
+                # Prepare metadata and evaluate; config is layered underneath as a
+                # view rather than copied in for every question
+                evaluation_metadata = ChainMap({
+                    'question': question,
                     'ground_truth': self.ground_truth,
                     'agent_response': processed_response.get('agent_answer'),
-                    'evaluation_metadata': processed_response.get('agent_generation_metadata'),
-                    **self.config
-                }
+                    'evaluation_metadata': processed_response.get('agent_generation_metadata')
+                }, config)
 
                 evaluation_results = self.evaluate_response(evaluation_metadata)
 
                 # TODO: Make the logic better, stopgap solution to work with custom
-                if self.eval_type != "CUSTOM":
+                if eval_type != "CUSTOM":
                     for metric_name, metric_info in evaluation_results['metrics_scores'].items():
-                        trace.score(name=str(self.eval_type + "_" + metric_name), value=metric_info.get('score'), comment=metric_info.get('explanation'))
+                        self._post_langfuse(trace.score, name=str(eval_type + "_" + metric_name), value=metric_info.get('score'), comment=metric_info.get('explanation'))
+
+                self._flush_langfuse()
 
                 # Update trace with final results
                 return {
                     'question_id': self.question_id,
-                    'question': self.question,
+                    'question': question,
                     'ground_truth': self.ground_truth,
                     'agent_response': processed_response,
                     'evaluation_results': evaluation_results,
@@ -344,49 +477,39 @@ class ToolEvaluator(ABC):
               
             except Exception as e:
                 self._handle_error(trace, e, "Evaluation")
+                self.throttled = is_throttling_error(e)
+                if is_fatal_error(e):
+                    raise FatalEvalError(str(e)) from e
                 return None
                 
+        except FatalEvalError:
+            raise
+        
         except Exception as e:
             self._handle_error(trace, e, "Agent Invocation")
+            self.throttled = is_throttling_error(e)
+            if is_fatal_error(e):
+                raise FatalEvalError(str(e)) from e
             return None
         
         except KeyboardInterrupt as e:
             self._handle_error(trace,e, "Manually Stopped Evaluation Job")
             raise KeyboardInterrupt
 
-class COTEvaluator(ToolEvaluator):
-    def __init__(self, **kwargs):
-        """Initialize COT Evaluator with all necessary components"""
-        super().__init__(**kwargs)
-        print(f"\nInitializing COT Evaluator for question {self.question_id}")
+# Judge prompt for COTEvaluator.evaluate_response; only the three fields are
+# substituted per question (the JSON braces are pre-escaped)
+def _reset_langfuse_pool() -> None:
+    # The child inherits the pool but not its worker thread
+    ToolEvaluator._tg_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='langfuse')
 
-    def _initialize_clients(self) -> None:
-        """Initialize evaluation-specific models using shared clients"""
-        print("Initializing clients...")
-        # Use shared clients
-        self.bedrock_agent_client = self.clients['bedrock_agent_client']
-        self.bedrock_agent_runtime_client = self.clients['bedrock_agent_runtime']
-        self.bedrock_client = self.clients['bedrock_runtime']
-        print("Clients initialized successfully")
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_langfuse_pool)
 
-    def evaluate_response(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Evaluate the COT response using specified metrics
-        
-        Args:
-            metadata (Dict[str, Any]): Evaluation metadata
-            
-        Returns:
-            Dict containing evaluation results
-        """
-        try:
-            print("\nStarting COT evaluation...")
-            # Prepare evaluation prompt
-            evaluation_prompt = f"""You are an expert evaluator for Chain of Thought reasoning. Evaluate the following response based on these metrics:
+_COT_PROMPT_TMPL = """You are an expert evaluator for Chain of Thought reasoning. Evaluate the following response based on these metrics:
 
-                Question: {metadata['question']}
-                Ground Truth: {metadata['ground_truth']}
-                Agent Response: {metadata['agent_response']}
+                Question: {question}
+                Ground Truth: {ground_truth}
+                Agent Response: {agent_response}
 
                 Evaluate and provide scores (0-1) and explanations for these metrics:
 
@@ -413,11 +536,40 @@ class COTEvaluator(ToolEvaluator):
                 }}
             """
 
-            print("Calling LLM for evaluation...")
+class COTEvaluator(ToolEvaluator):
+    def __init__(self, **kwargs):
+        """Initialize COT Evaluator with all necessary components"""
+        super().__init__(**kwargs)
+        logger.debug("Initializing COT Evaluator for question %s", self.question_id)
+
+    def _initialize_clients(self) -> None:
+        """Initialize evaluation-specific models using shared clients"""
+        logger.debug("Initializing clients...")
+        # Use shared clients
+        self.bedrock_agent_client = self.clients['bedrock_agent_client']
+        self.bedrock_agent_runtime_client = self.clients['bedrock_agent_runtime']
+        self.bedrock_client = self.clients['bedrock_runtime']
+        logger.debug("Clients initialized successfully")
+
+    def evaluate_response(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Evaluate the COT response using specified metrics
+        
+        Args:
+            metadata (Dict[str, Any]): Evaluation metadata
+            
+        Returns:
+            Dict containing evaluation results
+        """
+        try:
+            logger.debug("Starting COT evaluation...")
+            # Prepare evaluation prompt
+            evaluation_prompt = _COT_PROMPT_TMPL.format_map(metadata)
+
+            logger.debug("Calling LLM for evaluation...")
             # Call LLM for evaluation
-            response = self.bedrock_client.invoke_model(
-                modelId=self.config['MODEL_ID_EVAL_COT'],
-                body=json.dumps({
+            judge_text = self._invoke_judge(
+                _dumps({
                     "anthropic_version": "bedrock-2023-05-31",
                     "max_tokens": 1024,
                     "temperature": 0,
@@ -430,23 +582,56 @@ class COTEvaluator(ToolEvaluator):
                 })
             )
             
-            print("Parsing evaluation response...")
+            logger.debug("Parsing evaluation response...")
             # Parse and return the evaluation
-            evaluation = json.loads(json.loads(response['body'].read())['content'][0]['text'])
-            print("COT evaluation completed successfully")
+            evaluation = _loads(judge_text)
+            logger.debug("COT evaluation completed successfully")
             return evaluation
 
         except Exception as e:
-            print("\n=== COT Evaluation Error Details ===")
-            print(f"Error Type: {type(e).__name__}")
-            print(f"Error Message: {str(e)}")
+            logger.exception("COT evaluation error (%s): %s", type(e).__name__, e)
             if hasattr(e, 'response'):
-                print("\nResponse Details:")
-                print(f"Status Code: {getattr(e.response, 'status_code', 'N/A')}")
-                print(f"Response Body: {getattr(e.response, 'text', 'N/A')}")
-            print("===================================\n")
+                logger.error("Status Code: %s, Response Body: %s",
+                             getattr(e.response, 'status_code', 'N/A'), getattr(e.response, 'text', 'N/A'))
             raise Exception(f"Error in COT evaluation: {str(e)}")
 
+    def _invoke_judge(self, body) -> str:
+        """
+        Text of the judge model's reply, streamed as it is generated
+        
+        Falls back to a plain invoke_model call when the stream is throttled.
+        """
+        model_id = self.config['MODEL_ID_EVAL_COT']
+        try:
+            judge_text = self._stream_judge(model_id, body)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ThrottlingException':
+                raise
+            judge_text = None
+        
+        if judge_text is None:
+            logger.warning("Judge stream throttled, retrying with invoke_model")
+            response = self.bedrock_client.invoke_model(modelId=model_id, body=body)
+            # The raw body bytes go straight to the parser, without decoding to str first
+            envelope = _loads(response['body'].read())
+            judge_text = envelope['content'][0]['text']
+        return judge_text
+
+    def _stream_judge(self, model_id: str, body) -> Optional[str]:
+        """Collect the text deltas of a streamed judge reply; None if throttled mid-stream"""
+        response = self.bedrock_client.invoke_model_with_response_stream(modelId=model_id, body=body)
+        
+        text_parts = []
+        for event in response['body']:
+            if 'chunk' in event:
+                # Each chunk is one Anthropic messages stream event
+                payload = _loads(event['chunk']['bytes'])
+                if payload.get('type') == 'content_block_delta':
+                    text_parts.append(payload['delta'].get('text', ''))
+            elif 'throttlingException' in event:
+                return None
+        return "".join(text_parts)
+
     def invoke_agent(self, tries: int = 1) -> Tuple[Dict[str, Any], datetime]:
         """
         Invoke the COT agent and process its response
@@ -455,75 +640,79 @@ class COTEvaluator(ToolEvaluator):
             tries (int): Number of retry attempts
             
         Returns:
-            Tuple of (processed_response, start_time)
+            Tuple of (trace digest, processed_response, start_time)
         """
-        print(f"\nInvoking agent (attempt {tries})...")
+        # Start time is taken once, so retries count towards the agent latency
         agent_start_time = datetime.now()
         max_retries = 3
+        if tries > max_retries + 1:
+            # The retry loop below would make no attempt at all
+            raise ValueError(f"tries={tries} exceeds the {max_retries + 1} allowed attempts")
         
-        try:
-            # Invoke agent
-            print("Sending request to agent...")
-            raw_response = self.bedrock_agent_runtime_client.invoke_agent(
-                inputText=self.question,
-                agentId=self.config['AGENT_ID'],
-                agentAliasId=self.config['AGENT_ALIAS_ID'],
-                sessionId=self.session_id,
-                enableTrace=self.config['ENABLE_TRACE']
-            )
+        # Throttled calls are retried in this loop rather than recursively
+        for attempt in range(tries, max_retries + 2):
+            logger.debug("Invoking agent (attempt %s)...", attempt)
+            try:
+                # Invoke agent
+                logger.debug("Sending request to agent...")
+                raw_response = self.bedrock_agent_runtime_client.invoke_agent(
+                    inputText=self.question,
+                    agentId=self.config['AGENT_ID'],
+                    agentAliasId=self.config['AGENT_ALIAS_ID'],
+                    sessionId=self.session_id,
+                    enableTrace=self.config['ENABLE_TRACE']
+                )
 
-            print("Processing agent response...")
-            # Process response
-            agent_answer = None
-            input_tokens = 0
-            output_tokens = 0
-            full_trace = []
+                logger.debug("Processing agent response...")
+                # Process response; answer chunks are joined and decoded once at the end
+                answer_buf = bytearray()
+                input_tokens = 0
+                output_tokens = 0
+                # Trace events are folded in as they arrive instead of being kept
+                step_digest = self._new_trace_digest()
             
-            for event in raw_response['completion']:
-                if 'chunk' in event:
-                    agent_answer = event['chunk']['bytes'].decode('utf-8')
+                for event in raw_response['completion']:
+                    if 'chunk' in event:
+                        answer_buf += event['chunk']['bytes']
                     
-                elif "trace" in event:
-                    full_trace.append(event['trace'])
-                    trace_obj = event['trace']['trace']
-                    if "orchestrationTrace" in trace_obj:
-                        orc_trace = trace_obj['orchestrationTrace']
+                    elif "trace" in event:
+                        self._ingest_trace_event(event['trace'], step_digest)
+                        trace_obj = event['trace']['trace']
+                        if "orchestrationTrace" in trace_obj:
+                            orc_trace = trace_obj['orchestrationTrace']
                         
-                        # Extract token usage
-                        if 'modelInvocationOutput' in orc_trace:
-                            usage = orc_trace['modelInvocationOutput']['metadata']['usage']
-                            input_tokens += usage.get('inputTokens',0)
-                            output_tokens += usage.get('outputTokens',0)
-
-            processed_response = {
-                'agent_generation_metadata': {'ResponseMetadata': raw_response.get('ResponseMetadata', {})},
-                'agent_answer': agent_answer,
-                'input_tokens': input_tokens,
-                'output_tokens': output_tokens
-            }
+                            # Extract token usage
+                            if 'modelInvocationOutput' in orc_trace:
+                                usage = orc_trace['modelInvocationOutput']['metadata']['usage']
+                                input_tokens += usage.get('inputTokens',0)
+                                output_tokens += usage.get('outputTokens',0)
+
+                agent_answer = answer_buf.decode('utf-8') if answer_buf else None
+
+                processed_response = {
+                    'agent_generation_metadata': {'ResponseMetadata': raw_response.get('ResponseMetadata', {})},
+                    'agent_answer': agent_answer,
+                    'input_tokens': input_tokens,
+                    'output_tokens': output_tokens
+                }
 
-            print("Agent invocation completed successfully")
-            return full_trace, processed_response, agent_start_time
+                logger.debug("Agent invocation completed successfully")
+                return step_digest, processed_response, agent_start_time
                 
-        except Exception as e:
-            print("\n=== Agent Invocation Error Details ===")
-            print(f"Error Type: {type(e).__name__}")
-            print(f"Error Message: {str(e)}")
-            if hasattr(e, 'response'):
-                print("\nResponse Details:")
-                print(f"Status Code: {getattr(e.response, 'status_code', 'N/A')}")
-                print(f"Response Body: {getattr(e.response, 'text', 'N/A')}")
-            print("=====================================\n")
+            except Exception as e:
+                logger.exception("Agent invocation error (%s): %s", type(e).__name__, e)
+                if hasattr(e, 'response'):
+                    logger.error("Status Code: %s, Response Body: %s",
+                                 getattr(e.response, 'status_code', 'N/A'), getattr(e.response, 'text', 'N/A'))
             
-            if (hasattr(e, 'response') and 
-                'Error' in e.response and
-                e.response['Error'].get('Code') == 'throttlingException' and 
-                tries <= max_retries):
+                if (hasattr(e, 'response') and 
+                    'Error' in e.response and
+                    e.response['Error'].get('Code') == 'throttlingException' and 
+                    attempt <= max_retries):
                 
-                wait_time = 30 * tries
-                print(f"Throttling occurred. Attempt {tries} of {max_retries}. "
-                    f"Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
-                return self.invoke_agent(tries + 1)
-            else:
-                raise e
\ No newline at end of file
+                    wait_time = 30 * attempt
+                    logger.warning("Throttling occurred. Attempt %s of %s. Waiting %s seconds before retry...",
+                                   attempt, max_retries, wait_time)
+                    time.sleep(wait_time)
+                    continue
+                raise
\ No newline at end of file
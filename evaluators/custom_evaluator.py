@@ -5,6 +5,9 @@ from ragas import evaluate
 from evaluators.cot_evaluator import ToolEvaluator
 
 class CustomEvaluator(ToolEvaluator):
+    # Set to True if custom scoring does heavy CPU work in-process
+    CPU_BOUND = False
+    
     def __init__(self, **kwargs):
         """
         Initialize Custom Evaluator with all necessary components
@@ -10,15 +10,16 @@ This script demonstrates how to use the enhanced features:
 
 import os
 import sys
+import asyncio
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Import enhanced components
 from enhanced_run import EnhancedEvaluationFramework
-from hooks_system import HookType, HookContext
+from hooks_system import HookType, HookContext, HooksManager, CustomHook
 from cicd_integration import QualityGate
-from concurrent_evaluator import run_concurrent_evaluation
+from single_run import setup_environment, get_config
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -52,16 +53,15 @@ def example_performance_hook(context: HookContext):
         'message': 'Performance check passed'
     }
 
-def run_basic_example():
+async def run_basic_example():
     """Run basic concurrent evaluation example"""
     logger.info("=== Running Basic Concurrent Evaluation Example ===")
     
     # Load environment and setup
     load_dotenv('config.env')
-    from single_run import setup_environment, get_config
     
-    setup_environment()
-    config = get_config()
+    await asyncio.to_thread(setup_environment)
+    config = await asyncio.to_thread(get_config)
     
     # Create enhanced framework
     framework = EnhancedEvaluationFramework(config)
@@ -83,7 +83,7 @@ def run_basic_example():
     
     # Run concurrent evaluation
     data_file = os.getenv('DATA_FILE_PATH', 'data_files/data_file.json')
-    results = framework.run_concurrent_mode(data_file, max_workers=3)
+    results = await framework.run_concurrent_mode_async(data_file, max_workers=3)
     
     # Print results
     print("\n=== Basic Example Results ===")
@@ -96,16 +96,15 @@ def run_basic_example():
     
     return results
 
-def run_cicd_example():
+async def run_cicd_example():
     """Run CI/CD pipeline example"""
     logger.info("=== Running CI/CD Pipeline Example ===")
     
     # Load environment and setup
     load_dotenv('config.env')
-    from single_run import setup_environment, get_config
     
-    setup_environment()
-    config = get_config()
+    await asyncio.to_thread(setup_environment)
+    config = await asyncio.to_thread(get_config)
     
     # Create quality gate
     quality_gate = QualityGate(
@@ -121,7 +120,7 @@ def run_cicd_example():
     
     # Run CI/CD pipeline
     data_file = os.getenv('DATA_FILE_PATH', 'data_files/data_file.json')
-    results = framework.run_cicd_mode(data_file, quality_gate)
+    results = await framework.run_cicd_mode_async(data_file, quality_gate)
     
     # Print results
     print("\n=== CI/CD Pipeline Results ===")
@@ -145,17 +144,15 @@ def run_cicd_example():
     
     return results
 
-def run_hooks_example():
+async def run_hooks_example():
     """Run hooks system example"""
     logger.info("=== Running Hooks System Example ===")
     
     # Load environment and setup
     load_dotenv('config.env')
-    from single_run import setup_environment, get_config
-    from hooks_system import HooksManager, CustomHook
     
-    setup_environment()
-    config = get_config()
+    await asyncio.to_thread(setup_environment)
+    config = await asyncio.to_thread(get_config)
     
     # Create hooks manager
     hooks_manager = HooksManager()
@@ -178,21 +175,14 @@ def run_hooks_example():
     hooks_manager.register_hook(post_hook)
     
     # Execute hooks
-    pre_context = HookContext(
-        hook_type=HookType.PRE_EVALUATION,
-        data={'example': 'data', 'timestamp': datetime.now().isoformat()},
-        timestamp=datetime.now()
-    )
+    now = datetime.now()
+    pre_context = HookContext.pre({'example': 'data', 'timestamp': now.isoformat()}, timestamp=now)
     
-    pre_results = hooks_manager.execute_hooks(HookType.PRE_EVALUATION, pre_context)
+    pre_results = await hooks_manager.aexecute_hooks(HookType.PRE_EVALUATION, pre_context)
     
-    post_context = HookContext(
-        hook_type=HookType.POST_EVALUATION,
-        results={'execution_time': 245.67, 'status': 'completed'},
-        timestamp=datetime.now()
-    )
+    post_context = HookContext.post({'execution_time': 245.67, 'status': 'completed'})
     
-    post_results = hooks_manager.execute_hooks(HookType.POST_EVALUATION, post_context)
+    post_results = await hooks_manager.aexecute_hooks(HookType.POST_EVALUATION, post_context)
     
     # Print results
     print("\n=== Hooks System Results ===")
@@ -216,16 +206,15 @@ def run_hooks_example():
         'summary': summary
     }
 
-def run_comprehensive_example():
+async def run_comprehensive_example():
     """Run comprehensive example combining all features"""
     logger.info("=== Running Comprehensive Example ===")
     
     # Load environment and setup
     load_dotenv('config.env')
-    from single_run import setup_environment, get_config
     
-    setup_environment()
-    config = get_config()
+    await asyncio.to_thread(setup_environment)
+    config = await asyncio.to_thread(get_config)
     
     # Create enhanced framework with custom hooks
     framework = EnhancedEvaluationFramework(config)
@@ -257,7 +246,7 @@ def run_comprehensive_example():
     data_file = os.getenv('DATA_FILE_PATH', 'data_files/data_file.json')
     
     print("Running comprehensive evaluation...")
-    results = framework.run_cicd_mode(data_file, quality_gate)
+    results = await framework.run_cicd_mode_async(data_file, quality_gate)
     
     # Print comprehensive results
     print("\n=== Comprehensive Example Results ===")
@@ -291,6 +280,16 @@ def run_comprehensive_example():
     
     return results
 
+async def _run_examples():
+    """Run the four examples one after another on a single event loop"""
+    # Sequential on purpose: the examples share the default results file and
+    # the same agent, so running them side by side would clobber each other.
+    basic_results = await run_basic_example()
+    hooks_results = await run_hooks_example()
+    cicd_results = await run_cicd_example()
+    comprehensive_results = await run_comprehensive_example()
+    return basic_results, hooks_results, cicd_results, comprehensive_results
+
 def main():
     """Main function to run examples"""
     print("Enhanced Agent Evaluation Framework - Example Usage")
@@ -305,17 +304,7 @@ def main():
             sys.exit(1)
         
         # Run examples
-        print("\n1. Running Basic Concurrent Evaluation Example...")
-        basic_results = run_basic_example()
-        
-        print("\n2. Running Hooks System Example...")
-        hooks_results = run_hooks_example()
-        
-        print("\n3. Running CI/CD Pipeline Example...")
-        cicd_results = run_cicd_example()
-        
-        print("\n4. Running Comprehensive Example...")
-        comprehensive_results = run_comprehensive_example()
+        basic_results, hooks_results, cicd_results, comprehensive_results = asyncio.run(_run_examples())
         
         print("\n" + "=" * 60)
         print("ALL EXAMPLES COMPLETED SUCCESSFULLY!")
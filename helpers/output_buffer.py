@@ -0,0 +1,26 @@
+import io
+import sys
+import functools
+
+_out = io.StringIO()
+
+def p(*args, **kwargs):
+    """print() into the shared buffer instead of stdout"""
+    print(*args, file=_out, **kwargs)
+
+def flush():
+    """Write the buffered output to stdout in a single call"""
+    sys.stdout.write(_out.getvalue())
+    sys.stdout.flush()
+    _out.seek(0)
+    _out.truncate()
+
+def buffered(func):
+    """Flush everything written with p() once the wrapped function returns or raises"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            flush()
+    return wrapper
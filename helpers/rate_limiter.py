@@ -0,0 +1,46 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket whose refill rate adapts to throttling.
+
+    The rate is raised additively after each success and halved on every
+    throttling error (AIMD), so callers converge on the quota Bedrock
+    actually grants instead of sleeping a fixed interval.
+    """
+
+    def __init__(self, rate: float = 1.0, capacity: float = 1.0,
+                 min_rate: float = 1.0 / 90, max_rate: float = 10.0,
+                 increase: float = 1.0 / 90):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Take the token now (possibly going into debt) and sleep outside the lock
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+    def on_success(self) -> None:
+        """Additively raise the refill rate"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self) -> None:
+        """Halve the refill rate after a throttling error"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
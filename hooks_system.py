@@ -1,13 +1,44 @@
-from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Mapping, Iterator
 from dataclasses import dataclass
 from datetime import datetime
+import array
+import asyncio
+import bisect
+import collections
+import functools
 import logging
+import math
 import json
+import os
 import time
 from enum import Enum
+import sys
 import threading
 from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# The connectivity tests need these, but importing the hooks must not
+try:
+    import boto3
+    from botocore.config import Config
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+    ClientError = Exception
+
+try:
+    from langfuse import Langfuse
+except ImportError:
+    Langfuse = None
+
+try:
+    import orjson
+    
+    def _dumps_audit(records: List[Dict[str, Any]]) -> bytes:
+        return orjson.dumps(records, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:  # fall back to stdlib json
+    def _dumps_audit(records: List[Dict[str, Any]]) -> bytes:
+        return (json.dumps(records) + "\n").encode()
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +53,19 @@ class HookType(Enum):
     ERROR_HANDLER = "error_handler"
     INTEGRATION_TEST = "integration_test"
     CUSTOM = "custom"
+    
+    def __new__(cls, value: str):
+        member = object.__new__(cls)
+        member._value_ = value
+        # 1-based position, a plain attribute used to index HooksManager.hooks
+        # and its registration bitmask without a dict lookup
+        member.ordinal = len(cls.__members__) + 1
+        return member
+
+# Slotted dataclasses drop the per-instance __dict__; slots= needs Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+@dataclass(**_SLOTS)
 class HookContext:
     """Context passed to hooks"""
     hook_type: HookType
@@ -34,20 +76,46 @@ class HookContext:
     results: Optional[Dict[str, Any]] = None
     error: Optional[Exception] = None
     timestamp: Optional[datetime] = None
+    
+    @classmethod
+    def pre(cls, data: Dict[str, Any], session_id: Optional[str] = None,
+            turn_id: Optional[int] = None, timestamp: Optional[datetime] = None) -> 'HookContext':
+        """Context for PRE_EVALUATION hooks, timestamped now unless given"""
+        return cls(HookType.PRE_EVALUATION, session_id, turn_id, data=data,
+                   timestamp=timestamp or datetime.now())
+    
+    @classmethod
+    def post(cls, results: Dict[str, Any], session_id: Optional[str] = None,
+             turn_id: Optional[int] = None, timestamp: Optional[datetime] = None) -> 'HookContext':
+        """Context for POST_EVALUATION hooks, timestamped now unless given"""
+        return cls(HookType.POST_EVALUATION, session_id, turn_id, results=results,
+                   timestamp=timestamp or datetime.now())
 
-class BaseHook(ABC):
+class BaseHook:
     """Base class for all hooks"""
     
+    __slots__ = ('name', 'hook_type', 'hook_type_value', 'priority', 'enabled')
+    
     def __init__(self, name: str, hook_type: HookType, priority: int = 0):
         self.name = name
         self.hook_type = hook_type
+        # Cached so logging and history do not go through the enum each time
+        self.hook_type_value = hook_type.value
         self.priority = priority
         self.enabled = True
     
-    @abstractmethod
     def execute(self, context: HookContext) -> Dict[str, Any]:
         """Execute the hook logic"""
-        pass
+        raise NotImplementedError
+    
+    async def aexecute(self, context: HookContext) -> Dict[str, Any]:
+        """Execute the hook from an event loop; blocking hooks run in a worker thread"""
+        return await asyncio.to_thread(self.execute, context)
+    
+    @property
+    def native_async(self) -> bool:
+        """Whether aexecute awaits a coroutine rather than borrowing a thread"""
+        return False
     
     def __lt__(self, other):
         """Sort hooks by priority (higher priority first)"""
@@ -56,9 +124,18 @@ class BaseHook(ABC):
 class IntegrationTestHook(BaseHook):
     """Hook for running integration tests"""
     
-    def __init__(self, name: str, test_function: Callable, priority: int = 0):
+    __slots__ = ('test_function', 'async_test_function')
+    
+    def __init__(self, name: str, test_function: Callable, priority: int = 0,
+                 async_test_function: Optional[Callable] = None):
         super().__init__(name, HookType.INTEGRATION_TEST, priority)
         self.test_function = test_function
+        # Coroutine function used by aexecute instead of test_function in a thread
+        self.async_test_function = async_test_function
+    
+    @property
+    def native_async(self) -> bool:
+        return self.async_test_function is not None
     
     def execute(self, context: HookContext) -> Dict[str, Any]:
         """Execute integration test"""
@@ -80,38 +157,145 @@ class IntegrationTestHook(BaseHook):
                 'error': str(e),
                 'hook_name': self.name
             }
+    
+    async def aexecute(self, context: HookContext) -> Dict[str, Any]:
+        """Execute integration test, awaiting async_test_function when one was given"""
+        if self.async_test_function is None:
+            return await super().aexecute(context)
+        try:
+            start_time = time.time()
+            result = await self.async_test_function(context)
+            end_time = time.time()
+            
+            return {
+                'status': 'success',
+                'result': result,
+                'execution_time': end_time - start_time,
+                'hook_name': self.name
+            }
+        except Exception as e:
+            logger.error(f"Integration test {self.name} failed: {str(e)}")
+            return {
+                'status': 'failed',
+                'error': str(e),
+                'hook_name': self.name
+            }
+
+class IntegrationTestSuiteHook(BaseHook):
+    """Hook running several integration tests concurrently as one hook"""
+    
+    __slots__ = ('tests', '_executor', '_executor_lock')
+    
+    def __init__(self, name: str, tests: List[Callable], priority: int = 0):
+        super().__init__(name, HookType.INTEGRATION_TEST, priority)
+        self.tests = list(tests)
+        # The suite's own long-lived pool, created on first use; separate from
+        # the HooksManager pool this hook may itself be running on
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """The pool every run of the suite submits its tests to"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=max(len(self.tests), 1),
+                                                        thread_name_prefix="integration_tests")
+        return self._executor
+    
+    def _run_test(self, test: Callable, context: HookContext) -> Dict[str, Any]:
+        """Run one test, timing it and capturing any exception"""
+        try:
+            start_time = time.time()
+            result = test(context)
+            end_time = time.time()
+            return {
+                'status': 'success',
+                'result': result,
+                'execution_time': end_time - start_time
+            }
+        except Exception as e:
+            logger.error(f"Integration test {test.__name__} in {self.name} failed: {str(e)}")
+            return {
+                'status': 'failed',
+                'error': str(e)
+            }
+    
+    def _merge(self, outcomes: List[Dict[str, Any]], start_time: float) -> Dict[str, Any]:
+        """Combine per-test outcomes into one hook result"""
+        results = {test.__name__: outcome for test, outcome in zip(self.tests, outcomes)}
+        failed = [name for name, outcome in results.items() if outcome['status'] != 'success']
+        merged = {
+            'status': 'failed' if failed else 'success',
+            'results': results,
+            'execution_time': time.time() - start_time,
+            'hook_name': self.name
+        }
+        if failed:
+            merged['error'] = f"Failed tests: {', '.join(failed)}"
+        return merged
+    
+    def execute(self, context: HookContext) -> Dict[str, Any]:
+        """Run every test concurrently and merge the results"""
+        start_time = time.time()
+        executor = self._get_executor()
+        futures = [executor.submit(self._run_test, test, context) for test in self.tests]
+        return self._merge([future.result() for future in futures], start_time)
+    
+    async def aexecute(self, context: HookContext) -> Dict[str, Any]:
+        """Run every test on the suite's pool without blocking the event loop"""
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        outcomes = await asyncio.gather(
+            *(loop.run_in_executor(executor, self._run_test, test, context) for test in self.tests)
+        )
+        return self._merge(list(outcomes), start_time)
+
+def _compile_rule(field: str, rule: Dict[str, Any]) -> Callable[[Any], Optional[str]]:
+    """Build a check returning None when a value passes, else the failure message"""
+    required = rule.get('required', False)
+    expected_type = rule.get('type')
+    empty_message = f'Required field {field} is empty'
+    type_message = f'Field {field} has wrong type'
+    
+    def check(value: Any) -> Optional[str]:
+        if required and not value:
+            return empty_message
+        if expected_type and not isinstance(value, expected_type):
+            return type_message
+        return None
+    
+    return check
 
 class DataValidationHook(BaseHook):
     """Hook for validating data before evaluation"""
     
+    __slots__ = ('validation_rules', '_validators')
+    
     def __init__(self, name: str, validation_rules: Dict[str, Any], priority: int = 0):
         super().__init__(name, HookType.PRE_EVALUATION, priority)
         self.validation_rules = validation_rules
+        # The rules are fixed, so turn each into a check closure once
+        self._validators = [(field, _compile_rule(field, rule))
+                            for field, rule in validation_rules.items()]
     
     def execute(self, context: HookContext) -> Dict[str, Any]:
         """Validate data according to rules"""
         validation_results = []
+        data = context.data
         
-        if context.data:
-            for field, rule in self.validation_rules.items():
-                if field in context.data:
-                    value = context.data[field]
-                    if rule.get('required', False) and not value:
-                        validation_results.append({
-                            'field': field,
-                            'status': 'failed',
-                            'message': f'Required field {field} is empty'
-                        })
-                    elif rule.get('type') and not isinstance(value, rule['type']):
-                        validation_results.append({
-                            'field': field,
-                            'status': 'failed',
-                            'message': f'Field {field} has wrong type'
-                        })
+        if data:
+            for field, check in self._validators:
+                if field in data:
+                    message = check(data[field])
+                    if message is None:
+                        validation_results.append({'field': field, 'status': 'passed'})
                     else:
                         validation_results.append({
                             'field': field,
-                            'status': 'passed'
+                            'status': 'failed',
+                            'message': message
                         })
         
         return {
@@ -120,12 +304,83 @@ class DataValidationHook(BaseHook):
             'hook_name': self.name
         }
 
+class _TokenMetricsView(Mapping):
+    """Read-only per-key dict view over PerformanceMonitoringHook's buffers"""
+    
+    __slots__ = ('_hook',)
+    
+    def __init__(self, hook: 'PerformanceMonitoringHook'):
+        self._hook = hook
+    
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        hook = self._hook
+        i = hook._index[key]
+        input_tokens = hook.input_tokens[i]
+        output_tokens = hook.output_tokens[i]
+        ts = hook.timestamps[i]
+        return {
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'total_tokens': input_tokens + output_tokens,
+            'timestamp': None if math.isnan(ts) else datetime.fromtimestamp(ts)
+        }
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._hook.keys)
+    
+    def __len__(self) -> int:
+        return len(self._hook.keys)
+
 class PerformanceMonitoringHook(BaseHook):
     """Hook for monitoring performance metrics"""
     
+    __slots__ = ('keys', 'input_tokens', 'output_tokens', 'timestamps', '_index', 'metrics')
+    
     def __init__(self, name: str, priority: int = 0):
         super().__init__(name, HookType.POST_EVALUATION, priority)
-        self.metrics = {}
+        # One entry per session/turn, stored column-wise in typed buffers
+        self.keys: List[str] = []
+        self.input_tokens = array.array('q')
+        self.output_tokens = array.array('q')
+        self.timestamps = array.array('d')
+        self._index: Dict[str, int] = {}
+        self.metrics = _TokenMetricsView(self)
+    
+    def _store(self, key: str, input_tokens: int, output_tokens: int,
+               timestamp: Optional[datetime]) -> None:
+        """Append a row, or overwrite the one already recorded for key"""
+        ts = timestamp.timestamp() if timestamp is not None else float('nan')
+        # array('q') only takes ints; responses may carry None or floats
+        input_tokens = int(input_tokens or 0)
+        output_tokens = int(output_tokens or 0)
+        i = self._index.get(key)
+        if i is None:
+            self._index[key] = len(self.keys)
+            self.keys.append(key)
+            self.input_tokens.append(input_tokens)
+            self.output_tokens.append(output_tokens)
+            self.timestamps.append(ts)
+        else:
+            self.input_tokens[i] = input_tokens
+            self.output_tokens[i] = output_tokens
+            self.timestamps[i] = ts
+    
+    def get_summary(self) -> Dict[str, Any]:
+        """Token totals and means over every recorded turn"""
+        n = len(self.keys)
+        if not n:
+            return {'turns': 0, 'input_tokens': 0, 'output_tokens': 0, 'total_tokens': 0,
+                    'mean_total_tokens': 0.0}
+        # Zero-copy views over the array buffers
+        input_tokens = int(np.frombuffer(self.input_tokens, dtype=np.int64).sum())
+        output_tokens = int(np.frombuffer(self.output_tokens, dtype=np.int64).sum())
+        return {
+            'turns': n,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'total_tokens': input_tokens + output_tokens,
+            'mean_total_tokens': (input_tokens + output_tokens) / n
+        }
     
     def execute(self, context: HookContext) -> Dict[str, Any]:
         """Collect performance metrics"""
@@ -139,22 +394,21 @@ class PerformanceMonitoringHook(BaseHook):
                     
                     # Store metrics
                     key = f"{context.session_id}_{context.turn_id}"
-                    self.metrics[key] = {
-                        'input_tokens': input_tokens,
-                        'output_tokens': output_tokens,
-                        'total_tokens': input_tokens + output_tokens,
-                        'timestamp': context.timestamp
-                    }
+                    self._store(key, input_tokens, output_tokens, context.timestamp)
         
         return {
             'status': 'success',
-            'metrics': self.metrics,
+            # Totals instead of a copy of every recorded turn; the per-turn data
+            # stays available through self.metrics
+            'metrics': self.get_summary(),
             'hook_name': self.name
         }
 
 class ErrorHandlingHook(BaseHook):
     """Hook for handling errors during evaluation"""
     
+    __slots__ = ('error_handlers',)
+    
     def __init__(self, name: str, error_handlers: Dict[str, Callable], priority: int = 0):
         super().__init__(name, HookType.ERROR_HANDLER, priority)
         self.error_handlers = error_handlers
@@ -197,9 +451,18 @@ class ErrorHandlingHook(BaseHook):
 class CustomHook(BaseHook):
     """Hook for custom functionality"""
     
-    def __init__(self, name: str, hook_type: HookType, custom_function: Callable, priority: int = 0):
+    __slots__ = ('custom_function', 'async_function')
+    
+    def __init__(self, name: str, hook_type: HookType, custom_function: Callable, priority: int = 0,
+                 async_function: Optional[Callable] = None):
         super().__init__(name, hook_type, priority)
         self.custom_function = custom_function
+        # Coroutine function used by aexecute instead of custom_function in a thread
+        self.async_function = async_function
+    
+    @property
+    def native_async(self) -> bool:
+        return self.async_function is not None
     
     def execute(self, context: HookContext) -> Dict[str, Any]:
         """Execute custom hook function"""
@@ -217,100 +480,201 @@ class CustomHook(BaseHook):
                 'error': str(e),
                 'hook_name': self.name
             }
+    
+    async def aexecute(self, context: HookContext) -> Dict[str, Any]:
+        """Execute custom hook, awaiting async_function when one was given"""
+        if self.async_function is None:
+            return await super().aexecute(context)
+        try:
+            result = await self.async_function(context)
+            return {
+                'status': 'success',
+                'result': result,
+                'hook_name': self.name
+            }
+        except Exception as e:
+            logger.error(f"Custom hook {self.name} failed: {str(e)}")
+            return {
+                'status': 'failed',
+                'error': str(e),
+                'hook_name': self.name
+            }
+
+def _in_event_loop() -> bool:
+    """True when called from inside a running asyncio event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
 
 class HooksManager:
     """Manages the execution of hooks"""
     
-    def __init__(self):
-        self.hooks: Dict[HookType, List[BaseHook]] = {
-            hook_type: [] for hook_type in HookType
-        }
-        self.execution_history = []
-        self.max_workers = 5
+    def __init__(self, max_workers: int = 8, history_size: int = 10000):
+        # One priority-ordered list per hook type, indexed by its ordinal
+        self.hooks: List[List[BaseHook]] = [[] for _ in range(len(HookType) + 1)]
+        # Bit 1 << hook_type.ordinal is set while that type has at least one hook
+        self._registered_mask = 0
+        # Bounded, slimmed history; the summary comes from running counters
+        self.execution_history = collections.deque(maxlen=history_size)
+        self._total_executions = 0
+        self._total_success = 0
+        self._total_failed = 0
+        self._history_lock = threading.Lock()
+        self.max_workers = max_workers
+        # Created on first use so callers can still change max_workers after
+        # construction, then reused by every execute_hooks call
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """The long-lived pool used to run several hooks concurrently"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix="hooks")
+        return self._executor
+    
+    def close(self) -> None:
+        """Shut down the hook executor; it is recreated if hooks run again"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def __del__(self):
+        executor = getattr(self, '_executor', None)
+        if executor is not None:
+            executor.shutdown(wait=False)
     
     def register_hook(self, hook: BaseHook) -> None:
         """Register a hook"""
         if hook.enabled:
-            self.hooks[hook.hook_type].append(hook)
-            # Sort hooks by priority
-            self.hooks[hook.hook_type].sort()
-            logger.info(f"Registered hook: {hook.name} ({hook.hook_type.value})")
+            # Each list stays sorted by priority (highest first, see BaseHook.__lt__);
+            # insort keeps equal priorities in registration order, like a stable sort
+            bisect.insort(self.hooks[hook.hook_type.ordinal], hook)
+            self._registered_mask |= 1 << hook.hook_type.ordinal
+            logger.info(f"Registered hook: {hook.name} ({hook.hook_type_value})")
     
     def unregister_hook(self, hook_name: str, hook_type: HookType) -> None:
         """Unregister a hook by name and type"""
-        self.hooks[hook_type] = [
-            hook for hook in self.hooks[hook_type] 
+        # Filtering preserves the priority order
+        hooks = self.hooks[hook_type.ordinal] = [
+            hook for hook in self.hooks[hook_type.ordinal] 
             if hook.name != hook_name
         ]
+        if not hooks:
+            self._registered_mask &= ~(1 << hook_type.ordinal)
         logger.info(f"Unregistered hook: {hook_name}")
     
+    def has_hooks(self, hook_type: HookType) -> bool:
+        """Whether any hook is registered for a hook type"""
+        return bool(self._registered_mask & (1 << hook_type.ordinal))
+    
     def execute_hooks(self, hook_type: HookType, context: HookContext) -> List[Dict[str, Any]]:
         """Execute all hooks of a specific type"""
-        if hook_type not in self.hooks:
-            return []
-        
-        hooks = self.hooks[hook_type]
+        hooks = self.hooks[hook_type.ordinal]
         if not hooks:
             return []
         
         results = []
         
         # Execute hooks concurrently if there are multiple
-        if len(hooks) > 1:
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                future_to_hook = {
-                    executor.submit(hook.execute, context): hook 
-                    for hook in hooks
-                }
-                
-                for future in future_to_hook:
-                    hook = future_to_hook[future]
-                    try:
-                        result = future.result()
-                        results.append(result)
-                    except Exception as e:
-                        logger.error(f"Hook {hook.name} execution failed: {str(e)}")
-                        results.append({
-                            'status': 'exception',
-                            'error': str(e),
-                            'hook_name': hook.name
-                        })
+        if len(hooks) > 1 and all(hook.native_async for hook in hooks) and not _in_event_loop():
+            # Every hook is a coroutine, so one event loop beats a thread per hook
+            results = asyncio.run(self._gather_hooks(hooks, context))
+        elif len(hooks) > 1:
+            executor = self._get_executor()
+            futures = [executor.submit(self._run_hook, hook, context) for hook in hooks]
+            # All hooks are already running; collecting in submission order keeps
+            # the results in registration (priority) order
+            results = [future.result() for future in futures]
         else:
             # Execute single hook
-            hook = hooks[0]
-            try:
-                result = hook.execute(context)
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Hook {hook.name} execution failed: {str(e)}")
-                results.append({
-                    'status': 'exception',
-                    'error': str(e),
-                    'hook_name': hook.name
-                })
+            results.append(self._run_hook(hooks[0], context))
         
-        # Store execution history
-        self.execution_history.append({
-            'hook_type': hook_type.value,
-            'context': context,
-            'results': results,
-            'timestamp': datetime.now()
-        })
+        self._record_execution(hooks[0].hook_type_value, context, results)
+        return results
+    
+    async def aexecute_hooks(self, hook_type: HookType, context: HookContext) -> List[Dict[str, Any]]:
+        """Execute all hooks of a specific type concurrently on the running event loop"""
+        hooks = self.hooks[hook_type.ordinal]
+        if not hooks:
+            return []
         
+        results = await self._gather_hooks(hooks, context)
+        self._record_execution(hooks[0].hook_type_value, context, results)
         return results
     
+    async def _gather_hooks(self, hooks: List[BaseHook], context: HookContext) -> List[Dict[str, Any]]:
+        """Await every hook's aexecute, converting exceptions into result dicts"""
+        # At most max_workers hooks in flight, as with execute_hooks
+        semaphore = asyncio.Semaphore(self.max_workers)
+        
+        async def run(hook: BaseHook) -> Dict[str, Any]:
+            async with semaphore:
+                return await hook.aexecute(context)
+        
+        outcomes = await asyncio.gather(*(run(hook) for hook in hooks), return_exceptions=True)
+        
+        results = []
+        for hook, outcome in zip(hooks, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Hook {hook.name} execution failed: {str(outcome)}")
+                outcome = {
+                    'status': 'exception',
+                    'error': str(outcome),
+                    'hook_name': hook.name
+                }
+            results.append(outcome)
+        return results
+    
+    def _record_execution(self, hook_type_value: str, context: HookContext,
+                          results: List[Dict[str, Any]]) -> None:
+        """Update the counters and archive a slim record of the execution"""
+        n_success = sum(r['status'] == 'success' for r in results)
+        record = {
+            'hook_type': hook_type_value,
+            'session_id': context.session_id,
+            'turn_id': context.turn_id,
+            'n_results': len(results),
+            # Callers normally timestamp the context already; stored as an
+            # ISO string so the audit dump needs no datetime handling
+            'timestamp': (context.timestamp or datetime.now()).isoformat()
+        }
+        # Only the shared state is touched under the lock
+        with self._history_lock:
+            self._total_executions += 1
+            self._total_success += n_success
+            self._total_failed += len(results) - n_success
+            self.execution_history.append(record)
+    
+    def dump_audit(self, path: str) -> None:
+        """Write the retained execution history to path as a JSON array"""
+        with self._history_lock:
+            records = list(self.execution_history)
+        with open(path, 'wb') as f:
+            f.write(_dumps_audit(records))
+    
+    def _run_hook(self, hook: BaseHook, context: HookContext) -> Dict[str, Any]:
+        """Run one hook, converting unexpected exceptions into a result dict"""
+        try:
+            return hook.execute(context)
+        except Exception as e:
+            logger.error(f"Hook {hook.name} execution failed: {str(e)}")
+            return {
+                'status': 'exception',
+                'error': str(e),
+                'hook_name': hook.name
+            }
+    
     def get_execution_summary(self) -> Dict[str, Any]:
         """Get summary of hook executions"""
-        total_executions = len(self.execution_history)
-        successful_executions = 0
-        failed_executions = 0
-        
-        for execution in self.execution_history:
-            for result in execution['results']:
-                if result['status'] == 'success':
-                    successful_executions += 1
-                else:
-                    failed_executions += 1
+        with self._history_lock:
+            total_executions = self._total_executions
+            successful_executions = self._total_success
+            failed_executions = self._total_failed
         
         return {
             'total_executions': total_executions,
@@ -319,16 +683,50 @@ class HooksManager:
             'success_rate': successful_executions / total_executions if total_executions > 0 else 0.0
         }
 
+# Seconds a successful connectivity probe stays valid, and when each last passed
+_PROBE_TTL = 300
+_AGENT_LAST_OK_TS = float('-inf')
+_LANGFUSE_LAST_OK_TS = float('-inf')
+
+@functools.lru_cache(maxsize=1)
+def _get_bedrock():
+    """Process-wide bedrock-agent-runtime client shared by the integration tests"""
+    if boto3 is None:
+        raise ImportError("boto3 is required for the agent connectivity test")
+    
+    # Large enough pool for concurrently executing hooks to share one HTTPS session
+    return boto3.client('bedrock-agent-runtime',
+                        config=Config(max_pool_connections=32, retries={'mode': 'adaptive'}))
+
+@functools.lru_cache(maxsize=1)
+def _get_langfuse():
+    """Process-wide Langfuse client shared by the integration tests"""
+    if Langfuse is None:
+        raise ImportError("langfuse is required for the Langfuse connection test")
+    
+    return Langfuse(
+        public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
+        secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
+        host=os.getenv("LANGFUSE_HOST")
+    )
+
 # Example integration test functions
 def test_agent_connectivity(context: HookContext) -> Dict[str, Any]:
     """Test if agent is accessible"""
-    import boto3
-    from botocore.exceptions import ClientError
+    global _AGENT_LAST_OK_TS
+    
+    if time.monotonic() - _AGENT_LAST_OK_TS < _PROBE_TTL:
+        return {
+            'connectivity': 'success',
+            'message': 'Agent is accessible',
+            'cached': True
+        }
     
     try:
         # Test Bedrock agent runtime client
-        client = boto3.client('bedrock-agent-runtime')
+        client = _get_bedrock()
         # You could add a simple test call here
+        _AGENT_LAST_OK_TS = time.monotonic()
         return {
             'connectivity': 'success',
             'message': 'Agent is accessible'
@@ -362,21 +760,23 @@ def test_data_integrity(context: HookContext) -> Dict[str, Any]:
     }
 
 def test_langfuse_connection(context: HookContext) -> Dict[str, Any]:
-    """Test Langfuse connection"""
+    """Test Langfuse connection, re-probing at most once per _PROBE_TTL seconds"""
+    global _LANGFUSE_LAST_OK_TS
+    if time.monotonic() - _LANGFUSE_LAST_OK_TS < _PROBE_TTL:
+        return {
+            'langfuse': 'connected',
+            'message': 'Langfuse connection successful',
+            'cached': True
+        }
+    
     try:
-        from langfuse import Langfuse
-        import os
-        
-        langfuse = Langfuse(
-            public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
-            secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
-            host=os.getenv("LANGFUSE_HOST")
-        )
+        langfuse = _get_langfuse()
         
         # Create test trace
         test_trace = langfuse.trace(name="integration_test")
         test_trace.update(status_message="test_complete")
         langfuse.flush()
+        _LANGFUSE_LAST_OK_TS = time.monotonic()
         
         return {
             'langfuse': 'connected',
@@ -409,27 +809,13 @@ def create_default_hooks() -> HooksManager:
     """Create a HooksManager with default hooks"""
     manager = HooksManager()
     
-    # Integration test hooks
-    connectivity_hook = IntegrationTestHook(
-        "agent_connectivity_test", 
-        test_agent_connectivity, 
+    # Integration tests, run concurrently inside a single hook
+    integration_hook = IntegrationTestSuiteHook(
+        "integration_test_suite",
+        [test_agent_connectivity, test_data_integrity, test_langfuse_connection],
         priority=10
     )
-    manager.register_hook(connectivity_hook)
-    
-    integrity_hook = IntegrationTestHook(
-        "data_integrity_test", 
-        test_data_integrity, 
-        priority=9
-    )
-    manager.register_hook(integrity_hook)
-    
-    langfuse_hook = IntegrationTestHook(
-        "langfuse_connection_test", 
-        test_langfuse_connection, 
-        priority=8
-    )
-    manager.register_hook(langfuse_hook)
+    manager.register_hook(integration_hook)
     
     # Data validation hook
     validation_rules = {
@@ -1,20 +1,28 @@
 import os
+import atexit
+import functools
 import uuid
 import boto3
 import sys
 import json
 from typing import Dict, Any, List
 from evaluators.rag_evaluator import RAGEvaluator
-from evaluators.cot_evaluator import COTEvaluator
+from evaluators.cot_evaluator import COTEvaluator, is_throttling_error
 from evaluators.text2sql_evaluator import Text2SQLEvaluator
 from evaluators.custom_evaluator import CustomEvaluator
 from botocore.client import Config
 from helpers.agent_info_extractor import AgentInfoExtractor
-import time
+from helpers.rate_limiter import TokenBucket
 
 from dotenv import load_dotenv
 from langfuse import Langfuse
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # fall back to stdlib json
+    _loads = json.loads
+
 # Load environment variables from config.env
 load_dotenv('config.env')
 
@@ -42,21 +50,49 @@ MODEL_ID_EVAL_COT = os.getenv('MODEL_ID_EVAL_COT')
 #DATA
 DATA_FILE_PATH = os.getenv('DATA_FILE_PATH')
 
-def setup_environment() -> None:
-    """Set up the environment and initialize clients."""
+#PACING
+# Starting agent invocations per second for the sequential driver; the default
+# matches the old fixed 90 second wait and the rate adapts from there
+AGENT_INVOKE_RATE = float(os.getenv('AGENT_INVOKE_RATE', 1.0 / 90))
+if not AGENT_INVOKE_RATE > 0:  # also rejects NaN
+    raise ValueError(f"AGENT_INVOKE_RATE must be a positive number of invocations per second, "
+                     f"got {os.getenv('AGENT_INVOKE_RATE')!r}")
+
+_EVALUATOR_MAP = {
+    'RAG': RAGEvaluator,
+    'TEXT2SQL': Text2SQLEvaluator,
+    'COT': COTEvaluator,
+    'CUSTOM': CustomEvaluator
+    # Add other evaluator types here
+}
+
+@functools.lru_cache(maxsize=None)
+def init_langfuse() -> Langfuse:
+    """Construct the shared Langfuse client without contacting the server."""
     print("Initializing Langfuse client...")
     
-    # Initialize Langfuse client with debug mode
+    # Spans from every evaluator are batched by the client's background
+    # threads and only force-flushed once, at interpreter exit
     langfuse_client = Langfuse(
         public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
         secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
         host=os.getenv("LANGFUSE_HOST"),
-        debug=True  # Enable debug mode
+        flush_at=50,
+        flush_interval=2.0,
+        threads=4
     )
+    atexit.register(langfuse_client.flush)
     
     print(f"Langfuse client initialized with host: {os.getenv('LANGFUSE_HOST')}")
-    
-    # Test Langfuse connection with more detailed logging
+    return langfuse_client
+
+# A forked worker inherits the cached client but not its consumer threads,
+# so it must build its own
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=init_langfuse.cache_clear)
+
+def verify_langfuse(langfuse_client: Langfuse) -> None:
+    """Round-trip a test trace and span to confirm the Langfuse connection."""
     try:
         print("Creating test trace...")
         test_trace = langfuse_client.trace(
@@ -91,21 +127,40 @@ def setup_environment() -> None:
         langfuse_client.flush()
         
         print("✅ Successfully connected to Langfuse")
-        return langfuse_client
     except Exception as e:
         print(f"❌ Error connecting to Langfuse: {str(e)}")
         print(f"Debug info - Host: {os.getenv('LANGFUSE_HOST')}")
         print(f"Debug info - Public Key: {os.getenv('LANGFUSE_PUBLIC_KEY')}")
         raise
 
-def get_config() -> Dict[str, Any]:
-    """Get configuration settings"""
+def setup_environment() -> Langfuse:
+    """Set up the environment and initialize clients.
+    
+    The test trace round-trip only runs when LANGFUSE_VERIFY=1.
+    """
+    langfuse_client = init_langfuse()
+    if os.getenv('LANGFUSE_VERIFY') == '1':
+        verify_langfuse(langfuse_client)
+    return langfuse_client
 
-    # Create shared clients
+def get_config(max_concurrency: int = 15) -> Dict[str, Any]:
+    """Get configuration settings
+    
+    Args:
+        max_concurrency (int): Expected number of in-flight agent invocations
+            (sessions x turns per session); sizes the runtime connection pool
+    """
+
+    # Create shared clients; the runtime client is thread-safe and shared by
+    # every evaluation thread, so keep enough pooled keep-alive connections
+    # for all of them. invoke_agent retries throttling itself, so botocore
+    # must not retry on top of it (each attempt re-runs the agent)
     bedrock_config = Config(
         connect_timeout=120, 
         read_timeout=120, 
-        retries={'max_attempts': 0}
+        retries={'max_attempts': 1, 'mode': 'standard'},
+        max_pool_connections=int(os.getenv('BEDROCK_MAX_POOL_CONNECTIONS', max(64, max_concurrency * 2))),
+        tcp_keepalive=True
     )
 
     shared_clients = {
@@ -114,7 +169,8 @@ def get_config() -> Dict[str, Any]:
             'bedrock-agent-runtime',
             config=bedrock_config
         ),
-        'bedrock_runtime': boto3.client('bedrock-runtime')
+        'bedrock_runtime': boto3.client('bedrock-runtime'),
+        'langfuse': init_langfuse()
     }
 
     return {
@@ -131,22 +187,19 @@ def get_config() -> Dict[str, Any]:
     }
 
 
+def get_evaluator_class(eval_type: str) -> type:
+    """Look up the evaluator class for an evaluation type"""
+    try:
+        return _EVALUATOR_MAP[eval_type]
+    except KeyError:
+        raise ValueError(f"Unknown evaluation type: {eval_type}") from None
+
 def create_evaluator(eval_type: str, config: Dict[str, Any], 
                     agent_info: Dict[str, Any], data: Dict[str, Any], trace_id: str, 
                     session_id: str, trajectory_id: str) -> Any:
     """Create appropriate evaluator based on evaluation type"""
-    evaluator_map = {
-        'RAG': RAGEvaluator,
-        'TEXT2SQL': Text2SQLEvaluator,
-        'COT': COTEvaluator,
-        'CUSTOM': CustomEvaluator
-        # Add other evaluator types here
-    }
+    evaluator_class = get_evaluator_class(eval_type)
     
-    evaluator_class = evaluator_map.get(eval_type)
-    if not evaluator_class:
-        raise ValueError(f"Unknown evaluation type: {eval_type}")
-        
     return evaluator_class(
         config=config,
         agent_info=agent_info,
@@ -169,9 +222,12 @@ def run_evaluation(data_file: str) -> None:
     extractor = AgentInfoExtractor(config['clients']['bedrock_agent_client'])
     agent_info = extractor.extract_agent_info(AGENT_ID, AGENT_ALIAS_ID)
     
+    # Pace agent invocations; the rate adapts to observed throttling
+    rate_limiter = TokenBucket(rate=AGENT_INVOKE_RATE, min_rate=min(AGENT_INVOKE_RATE, 1.0 / 90))
+    
     # Load and process data
-    with open(data_file, 'r') as f:
-        data_dict = json.load(f)
+    with open(data_file, 'rb') as f:
+        data_dict = _loads(f.read())
         
         #For each data file, go into each trajectory
         for trajectoryID, questions in data_dict.items():
@@ -189,8 +245,9 @@ def run_evaluation(data_file: str) -> None:
 
                 print(f"Running {trajectoryID} - {eval_type} - Q{question_id} evaluation")
 
-                trace_id = str(uuid.uuid1())
-                              
+                trace_id = uuid.uuid4().hex
+                
+                rate_limiter.acquire()
                 try:
                     evaluator = create_evaluator(
                         eval_type=eval_type,
@@ -205,18 +262,21 @@ def run_evaluation(data_file: str) -> None:
 
                     results = evaluator.run_evaluation()
                     if results is None:
+                        # Evaluators log and swallow their own errors; they flag throttling
+                        if getattr(evaluator, 'throttled', False):
+                            rate_limiter.on_throttle()
                         print(f"Skipping {trajectoryID} question {question_id} due to evaluation failure")
-                        time.sleep(90)
                         continue
                         
                     print(f"Successfully evaluated {trajectoryID} question {question_id}")
                     # print(results)
-                    time.sleep(90)
+                    rate_limiter.on_success()
                     
                 except Exception as e:
                     print(f"Failed to evalute for {trajectoryID} question {question_id}: {str(e)}")
+                    if is_throttling_error(e) or 'throttl' in str(e).lower():
+                        rate_limiter.on_throttle()
                     #if not a bedrock error, continue to next question
-                    time.sleep(90)
                     continue
                 
                 except KeyboardInterrupt: